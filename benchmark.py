@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+
+import argparse
+import gc
+import importlib
+import json
+from math import ceil, log2
+from statistics import median
+import sys
+from time import perf_counter_ns
+
+
+# The complexity classes that a scaling benchmark is fitted against, as a function of the problem size n
+COMPLEXITY_MODELS = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: log2(n + 1),
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * log2(n + 1),
+}
+
+# The problem modules that provide a `benchmark_cases` function
+PROBLEM_MODULES = [f"problem_{i}" for i in range(1, 8)]
+
+
+def percentile(values: list, percent: float) -> float:
+    """Returns the nearest-rank percentile of the given values.
+
+    Args:
+        values (list): The values to take the percentile of.
+        percent (float): The percentile in [0, 100].
+
+    Returns:
+        float: The smallest value with at least `percent` percent of the values at or below it.
+    """
+    ordered = sorted(values)
+    rank = max(ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(func, setup=None, warmup: int = 1, repeat: int = 5, number: int = 1) -> dict:
+    """Times the given function with `perf_counter_ns`.
+
+    Like `timeit`, the garbage collector is disabled while timing so that collections triggered by the setup don't
+    land in the timed calls.
+
+    Args:
+        func (callable): The function to time.
+        setup (callable | None): Returns the tuple of arguments for `func`, called untimed before every repeat so that
+            in-place algorithms always get fresh input.
+        warmup (int): The number of untimed calls before timing starts.
+        repeat (int): The number of timed repeats.
+        number (int): The number of calls per repeat, the reported times are per call.
+
+    Returns:
+        dict: The median, 95th percentile and minimum time per call in nanoseconds.
+    """
+    for _ in range(warmup):
+        func(*(setup() if setup else ()))
+
+    times = []
+    gc_enabled = gc.isenabled()
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        gc.disable()
+        try:
+            start_time = perf_counter_ns()
+            for _ in range(number):
+                func(*args)
+            times.append((perf_counter_ns() - start_time) / number)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    return {"median_ns": median(times), "p95_ns": percentile(times, 95), "min_ns": min(times), "repeat": repeat,
+            "number": number}
+
+
+def fit_complexity(sizes: list, times: list) -> tuple:
+    """Fits the times to every complexity class in `COMPLEXITY_MODELS` and returns the best.
+
+    Each class is fitted as t = a * f(n) by least squares on the relative error (1 - a * f(n) / t), so the small and
+    large sizes carry the same weight.
+
+    Args:
+        sizes (list): The problem sizes.
+        times (list): The measured time for every size.
+
+    Returns:
+        (str),(dict): The best complexity class and the residual of every class.
+    """
+    residuals = {}
+    for name, model in COMPLEXITY_MODELS.items():
+        try:
+            ratios = [model(n) / t for n, t in zip(sizes, times)]
+        except (OverflowError, ZeroDivisionError):
+            residuals[name] = float("inf")
+            continue
+        scale = sum(ratios) / sum(r * r for r in ratios)
+        residuals[name] = sum((1 - scale * r) ** 2 for r in ratios)
+
+    return min(residuals, key=residuals.get), residuals
+
+
+def scaling(name: str, func, setup, sizes: list, expected: str | None = None, warmup: int = 1, repeat: int = 5,
+            number: int = 1, fresh_input: bool = False) -> dict:
+    """Times the given function over a range of problem sizes and fits its complexity class.
+
+    Args:
+        name (str): The unique name of the benchmark, used to match it with a baseline.
+        func (callable): The function to time.
+        setup (callable): Called with the size n, returns the tuple of arguments for `func`.
+        sizes (list): The problem sizes.
+        expected (str | None): The expected complexity class, one of the keys of `COMPLEXITY_MODELS`.
+        warmup (int): The number of untimed calls per size.
+        repeat (int): The number of timed repeats per size.
+        number (int): The number of calls per repeat.
+        fresh_input (bool): Call `setup` before every repeat instead of once per size, for in-place algorithms.
+
+    Returns:
+        dict: The JSON ready benchmark result.
+    """
+    medians = []
+    p95s = []
+    for n in sizes:
+        if fresh_input:
+            stats = measure(func, setup=lambda: setup(n), warmup=warmup, repeat=repeat, number=number)
+        else:
+            args = setup(n)
+            stats = measure(func, setup=lambda: args, warmup=warmup, repeat=repeat, number=number)
+            del args
+        medians.append(stats["median_ns"])
+        p95s.append(stats["p95_ns"])
+    complexity, residuals = fit_complexity(sizes, medians)
+
+    return {"name": name, "sizes": list(sizes), "median_ns": medians, "p95_ns": p95s, "complexity": complexity,
+            "expected": expected, "residuals": residuals, "repeat": repeat, "number": number}
+
+
+def check_complexity(result: dict, low: float = 0.5, high: float = 3.0) -> bool:
+    """Checks that the times of a scaling result grow like its expected complexity class.
+
+    The time ratio to the smallest size is divided by the ratio predicted by the expected class, and every one of these
+    scaled ratios must be between `low` and `high`. This is more forgiving than requiring the best fit to be the
+    expected class, since neighbouring classes such as O(n) and O(n log n) are hard to separate over a few sizes.
+
+    Args:
+        result (dict): A result returned by `scaling` with an expected complexity class.
+        low (float): The lowest allowed scaled ratio.
+        high (float): The highest allowed scaled ratio.
+
+    Returns:
+        bool: True if the times agree with the expected class.
+    """
+    model = COMPLEXITY_MODELS[result["expected"]]
+    sizes = result["sizes"]
+    times = result["median_ns"]
+    for n, t in zip(sizes[1:], times[1:]):
+        scaled = (t / times[0]) / (model(n) / model(sizes[0]))
+        if not low <= scaled <= high:
+            return False
+    return True
+
+
+def print_scaling(result: dict):
+    """Prints the table of a scaling benchmark result.
+
+    Args:
+        result (dict): A result returned by `scaling`.
+    """
+    sizes = result["sizes"]
+    medians = result["median_ns"]
+    print(f"\t{result['name']}")
+    print("\t    Size | median (ms) |  p95 (ms) | size ratio | time ratio")
+    for n, t, t95 in zip(sizes, medians, result["p95_ns"]):
+        print(f"\t{n:>8.0e} | {t / 1e6:>11.4f} | {t95 / 1e6:>9.4f} | {n / sizes[0]:>10.1e} | {t / medians[0]:>10.1f}")
+    print(f"\tBest fit: {result['complexity']}, expected: {result['expected']}")
+
+
+def compare(results: list, baseline: list, tolerance: float = 1.5) -> list:
+    """Compares benchmark results against a baseline.
+
+    A median time above `tolerance` times the baseline is a regression. A changed best-fit complexity class is only a
+    regression if the times also fail `check_complexity` against the expected class of the baseline.
+
+    Args:
+        results (list): The results returned by `scaling`.
+        baseline (list): The baseline results, typically loaded from a previous JSON output.
+        tolerance (float): The allowed ratio between the new and the baseline median times.
+
+    Returns:
+        list: A message for every regression, empty if there were none.
+    """
+    baseline = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        name = result["name"]
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        # Neighbouring best fits are hard to separate, so a changed fit only counts if the times also don't scale
+        # like the class the baseline expected, or its best fit if it had none
+        expected = base["expected"] or base["complexity"]
+        if result["complexity"] != base["complexity"] and not check_complexity({**result, "expected": expected}):
+            regressions.append(f"{name}: complexity changed from {base['complexity']} to {result['complexity']}.")
+        base_times = dict(zip(base["sizes"], base["median_ns"]))
+        for n, t in zip(result["sizes"], result["median_ns"]):
+            if n in base_times and t > tolerance * base_times[n]:
+                regressions.append(f"{name}: n = {n:.0e} took {t / base_times[n]:.2f} times the baseline.")
+
+    return regressions
+
+
+def main(argv: list | None = None) -> int:
+    """Runs the benchmark cases of the problem modules and optionally compares them against a baseline.
+
+    Args:
+        argv (list | None): The command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The number of regressions and unexpected complexity classes, 0 if everything passed.
+    """
+    parser = argparse.ArgumentParser(description="Scaling benchmarks of the problem algorithms.")
+    parser.add_argument("--output", help="Write the JSON results to this file.")
+    parser.add_argument("--baseline", help="Compare the results against this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed ratio of new to baseline times.")
+    parser.add_argument("--problems", nargs="*", type=int, help="Only benchmark these problem numbers.")
+    args = parser.parse_args(argv)
+
+    results = []
+    n_errors = 0
+    for module_name in PROBLEM_MODULES:
+        if args.problems and int(module_name.split("_")[1]) not in args.problems:
+            continue
+        module = importlib.import_module(module_name)
+        for case in module.benchmark_cases():
+            result = scaling(**case)
+            print_scaling(result)
+            results.append(result)
+            if result["expected"] is not None and not check_complexity(result):
+                print(f"Unexpected complexity for {result['name']}.")
+                n_errors += 1
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"Regression; {regression}")
+        n_errors += len(regressions)
+
+    return n_errors
+
+
+# **********************************************************
+if __name__ == '__main__':
+    sys.exit(1 if main() > 0 else 0)
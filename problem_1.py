@@ -1,15 +1,30 @@
 #!/usr/bin/env python3
 
-from time import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from math import isqrt
+import os
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from benchmark import measure, print_scaling, scaling
 
 
 def modified_binary_search(squared_value: int, left: int, right: int, debug: bool = False) -> int:
     """A modified binary search that looks for the square root of the given value.
 
+    The search is a loop rather than a recursion, so very large values can't overflow the call stack.
+
     Args:
         squared_value (int): The integer that we wish to find the square root of.
-        left (int) : The lowest value in the range of possible values.
-        right (int): The highest value in the range of possible values.
+        left (int) : The lowest value in the range of possible values, left ** 2 <= squared_value.
+        right (int): The highest value in the range of possible values, right ** 2 > squared_value.
         debug (bool): Print extra info if True
 
     Returns:
@@ -17,56 +32,343 @@ def modified_binary_search(squared_value: int, left: int, right: int, debug: boo
     """
 
     # If left and right next to each other, the square root must be a float between them
-    if right - left <= 1:
-        if debug:
-            print(f"left={left}, right={right}")
-        return left
-
-    center = (left + right) // 2
-    center_squared = center ** 2
-
-    # If the squared values match, we have found the square root
-    if center_squared == squared_value:
-        if debug:
-            print(f"Found; center={center}, left={left}, right={right}")
-        return center
-
-    # if not, recurse either above of below the center
-    if center_squared < squared_value:
-        if debug:
-            print(f"Recurse top; center={center}, left={left}, right={right}")
-        return modified_binary_search(squared_value, center, right)
-    else:
-        if debug:
-            print(f"Recurse bottom; center={center}, left={left}, right={right}")
-        return modified_binary_search(squared_value, left, center)
+    while right - left > 1:
+        center = (left + right) // 2
+        center_squared = center ** 2
 
+        # If the squared values match, we have found the square root
+        if center_squared == squared_value:
+            if debug:
+                print(f"Found; center={center}, left={left}, right={right}")
+            return center
 
-def sqrt(number: int) -> int:
-    """Calculate the floored square root of a number.
+        # if not, search either above of below the center
+        if center_squared < squared_value:
+            if debug:
+                print(f"Search top; center={center}, left={left}, right={right}")
+            left = center
+        else:
+            if debug:
+                print(f"Search bottom; center={center}, left={left}, right={right}")
+            right = center
+
+    if debug:
+        print(f"left={left}, right={right}")
+    return left
+
+
+def binary_sqrt(number: int) -> int:
+    """Calculate the floored square root of a number > 1 with the modified binary search.
+
+    The bit length of the number bounds the root to [2^((b-1)//2), 2^((b+1)//2)), so the search range is only about
+    half the bits of the number wide instead of starting at number // 2.
 
     Args:
-       number(int): Number to find the floored squared root
+       number(int): Number > 1 to find the floored squared root
 
     Returns:
        int: Floored Square Root
+    """
+    bit_length = number.bit_length()
+    return modified_binary_search(number, 1 << ((bit_length - 1) // 2), 1 << ((bit_length + 1) // 2))
+
+
+def newton_sqrt(number: int) -> int:
+    """Calculate the floored square root of a number > 1 with an integer Newton iteration.
+
+    The first guess 2^((b+1)//2) is always above the root, so the iteration decreases monotonically until it stops
+    improving. The number of correct bits doubles every iteration, which makes this O(log log n) iterations.
+
+    Args:
+       number(int): Number > 1 to find the floored squared root
+
+    Returns:
+       int: Floored Square Root
+    """
+    x = 1 << ((number.bit_length() + 1) // 2)
+    while True:
+        y = (x + number // x) // 2
+        if y >= x:
+            return x
+        x = y
+
+
+# The selectable square root engines, all return the floored square root of a number > 1
+SQRT_ENGINES = {
+    "binary": binary_sqrt,
+    "newton": newton_sqrt,
+    "isqrt": isqrt,
+}
+
+
+def check_number(number: int):
+    """Checks that the given number is a valid argument for the square root.
+
+    Args:
+       number(int): Number to check
 
     Raises:
         AttributeError: If the given number is not a positive integer.
     """
-
-    # Check arguments
     if not isinstance(number, int):
         raise AttributeError("The number must be an integer.")
     if number < 0:
         raise AttributeError("The number must be a positive integer.")
 
+
+def sqrt(number: int, engine: str = "newton") -> int:
+    """Calculate the floored square root of a number.
+
+    Args:
+       number(int): Number to find the floored squared root
+       engine(str): The square root engine, one of "binary", "newton" or "isqrt"
+
+    Returns:
+       int: Floored Square Root
+
+    Raises:
+        AttributeError: If the given number is not a positive integer or the engine is unknown.
+    """
+
+    # Check arguments
+    check_number(number)
+    if engine not in SQRT_ENGINES:
+        raise AttributeError(f"The engine must be one of {', '.join(SQRT_ENGINES)}.")
+
     # 0 and 1 are squares of themselves
     if number <= 1:
         return number
 
-    # The square root must be between 1 and half of the number since 0 and 1 are handled above
-    return modified_binary_search(number, 1, number // 2)
+    return SQRT_ENGINES[engine](number)
+
+
+def float_sqrt(number: int) -> int:
+    """Calculate the floored square root of a 0 <= number < 2^64 from a float estimate and an integer correction.
+
+    The float estimate is within one of the root for 64-bit values, so the correction loops run at most once or twice.
+
+    Args:
+       number(int): Number to find the floored squared root
+
+    Returns:
+       int: Floored Square Root
+    """
+    root = int(number ** 0.5)
+    while root * root > number:
+        root -= 1
+    while (root + 1) * (root + 1) <= number:
+        root += 1
+    return root
+
+
+def _numpy_sqrt_many(values) -> tuple:
+    """The vectorized version of `sqrt_many` for NumPy arrays."""
+
+    # Only signed and unsigned integer arrays are valid, and the signed ones must be positive
+    if values.dtype.kind not in "iu":
+        return np.zeros(values.shape, dtype=np.uint64), np.ones(values.shape, dtype=bool)
+    errors = values < 0 if values.dtype.kind == "i" else np.zeros(values.shape, dtype=bool)
+    numbers = np.where(errors, 0, values).astype(np.uint64)
+
+    # The float estimate, clipped so that the squares below can't overflow 64 bits
+    max_root = np.uint64(2 ** 32 - 1)
+    roots = np.minimum(np.sqrt(numbers.astype(np.float64)).astype(np.uint64), max_root)
+
+    # The integer correction step, the estimate is at most one away from the floored root
+    roots -= (roots * roots > numbers).astype(np.uint64)
+    next_roots = roots + np.uint64(1)
+    roots += ((roots < max_root) & (next_roots * next_roots <= numbers)).astype(np.uint64)
+
+    return roots, errors
+
+
+def sqrt_many(values) -> tuple:
+    """Calculate the floored square roots of many numbers at once.
+
+    Invalid values don't raise an exception like `sqrt`. Instead, they are flagged in the returned error mask and their
+    root is set to 0. NumPy int64 and uint64 arrays are processed with vectorized operations.
+
+    Args:
+       values(list | array.array | numpy.ndarray): The numbers to find the floored squared roots of
+
+    Returns:
+       (list),(list): The floored square roots and the error mask, both NumPy arrays if given a NumPy array
+
+    Raises:
+        AttributeError: If the given values are not a list, array.array or NumPy array.
+    """
+
+    # Check arguments
+    if np is not None and isinstance(values, np.ndarray):
+        return _numpy_sqrt_many(values)
+    if not isinstance(values, (list, array)):
+        raise AttributeError("The values must be a list, array.array or NumPy array.")
+
+    roots = []
+    errors = []
+    for number in values:
+        try:
+            check_number(number)
+        except AttributeError:
+            roots.append(0)
+            errors.append(True)
+            continue
+        roots.append(float_sqrt(number) if number < 2 ** 64 else newton_sqrt(number))
+        errors.append(False)
+
+    return roots, errors
+
+
+def _sqrt_chunk(numbers: list, engine: str) -> list:
+    """Calculate the floored square roots of a chunk of numbers in a worker process."""
+    return [sqrt(number, engine=engine) for number in numbers]
+
+
+def sqrt_parallel(numbers: list, chunk_size: int = 64, max_workers: int | None = None,
+                  engine: str = "newton") -> list:
+    """Calculate the floored square roots of many numbers across a pool of worker processes.
+
+    The numbers are split into chunks that are sent to the workers, and the roots are returned in the original order.
+    This only pays off for very large numbers, where the root costs far more than pickling the number.
+
+    Args:
+       numbers(list): The numbers to find the floored squared roots of
+       chunk_size(int): The number of numbers sent to a worker at a time
+       max_workers(int | None): The number of worker processes, defaults to the number of CPUs
+       engine(str): The square root engine, one of "binary", "newton" or "isqrt"
+
+    Returns:
+       list: The floored square roots in the same order as the given numbers
+
+    Raises:
+        AttributeError: If the arguments are invalid, including any number that is not a positive integer.
+    """
+
+    # Check arguments, all numbers are checked up front so no work is wasted on an invalid batch
+    if not isinstance(numbers, list):
+        raise AttributeError("The numbers must be a list.")
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise AttributeError("The chunk size must be a positive integer.")
+    if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+        raise AttributeError("The maximum number of workers must be a positive integer.")
+    if engine not in SQRT_ENGINES:
+        raise AttributeError(f"The engine must be one of {', '.join(SQRT_ENGINES)}.")
+    for number in numbers:
+        check_number(number)
+
+    chunks = [numbers[i:i + chunk_size] for i in range(0, len(numbers), chunk_size)]
+    if len(chunks) <= 1 or max_workers == 1:
+        return [root for chunk in chunks for root in _sqrt_chunk(chunk, engine)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_sqrt_chunk, chunks, [engine] * len(chunks))
+        return [root for chunk_roots in results for root in chunk_roots]
+
+
+class SqrtCacheInfo(NamedTuple):
+    """The statistics reported by `SqrtCache.cache_info`."""
+    hits: int
+    table_hits: int
+    misses: int
+    evictions: int
+    size: int
+    capacity: int
+
+
+class SqrtCache:
+    """An opt-in LRU cache around `sqrt` for workloads with many repeated numbers.
+
+    Numbers below `table_limit ** 2` are answered from a precomputed table of perfect squares with a binary search, the
+    rest are answered from a bounded LRU cache that evicts the least recently used number once it is full.
+    """
+
+    def __init__(self, capacity: int = 1024, table_limit: int = 1024, engine: str = "newton"):
+        """The object instantiation method.
+
+        Args:
+            capacity (int): The maximum number of cached roots, 0 disables the LRU cache.
+            table_limit (int): The perfect squares 0^2 through table_limit^2 are precomputed.
+            engine (str): The square root engine used on a cache miss.
+
+        Raises:
+            AttributeError: If the capacity or table limit is not a positive integer or the engine is unknown.
+        """
+
+        # Check arguments
+        if not isinstance(capacity, int) or capacity < 0:
+            raise AttributeError("The capacity must be a positive integer.")
+        if not isinstance(table_limit, int) or table_limit < 0:
+            raise AttributeError("The table limit must be a positive integer.")
+        if engine not in SQRT_ENGINES:
+            raise AttributeError(f"The engine must be one of {', '.join(SQRT_ENGINES)}.")
+
+        self.capacity = capacity
+        self.engine = engine
+        self.squares = [k * k for k in range(table_limit + 1)]
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.table_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, number: int) -> int:
+        """Calculate the floored square root of a number, see `sqrt`.
+
+        Args:
+           number(int): Number to find the floored squared root
+
+        Returns:
+           int: Floored Square Root
+
+        Raises:
+            AttributeError: If the given number is not a positive integer.
+        """
+
+        # The check must come first, since 9.0 would otherwise hit the cached root of 9
+        check_number(number)
+
+        if number < self.squares[-1]:
+            self.table_hits += 1
+            return bisect_right(self.squares, number) - 1
+
+        root = self.cache.get(number)
+        if root is not None:
+            self.hits += 1
+            self.cache.move_to_end(number)
+            return root
+
+        self.misses += 1
+        root = sqrt(number, engine=self.engine)
+        if self.capacity > 0:
+            self.cache[number] = root
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+        return root
+
+    def cache_info(self) -> SqrtCacheInfo:
+        """Returns the cache statistics.
+
+        Returns:
+            SqrtCacheInfo: The hits, table hits, misses, evictions, current size and capacity of the cache.
+        """
+        return SqrtCacheInfo(hits=self.hits, table_hits=self.table_hits, misses=self.misses,
+                             evictions=self.evictions, size=len(self.cache), capacity=self.capacity)
+
+    def cache_clear(self):
+        """Empties the LRU cache and resets the statistics, the perfect square table is kept."""
+        self.cache.clear()
+        self.hits = self.table_hits = self.misses = self.evictions = 0
+
+
+def benchmark_cases() -> list:
+    """The scaling benchmark cases of this problem, see `benchmark.scaling`.
+
+    Returns:
+        list: The keyword arguments of every scaling benchmark.
+    """
+    return [dict(name="problem_1.sqrt", func=sqrt, setup=lambda n: (n,), sizes=[10 ** (100 + 50 * i) for i in range(5)],
+                 expected="O(log n)", number=1000)]
 
 
 def given_tests():
@@ -102,11 +404,8 @@ def user_tests():
     n = 150
     expected = 10**n
     squared_value = expected ** 2 + 1
-    actual = 0
-    start_time = time()
-    for _ in range(1000):
-        actual = sqrt(squared_value)
-    runtime = time() - start_time
+    actual = sqrt(squared_value)
+    runtime = measure(sqrt, setup=lambda: (squared_value,), repeat=1, number=1000)["median_ns"] * 1000 / 1e9
     if actual == expected:
         print(f"Test {test} passed; square value 10^{n}^2+1 solved 1000 times in {runtime:.4f} seconds.")
     else:
@@ -114,23 +413,144 @@ def user_tests():
         n_errors += 1
 
     # User Test Case 3 - Scaling test
-    print("\nUser test set 3 - Four other numbers timed for scalability check.")
-    times = [runtime]
-    values = [squared_value]
-    for _ in range(4):
-        squared_value = squared_value // (10**50)
-        start_time = time()
-        for _ in range(1000):
-            sqrt(squared_value)
-        times.append(time() - start_time)
-        values.append(squared_value)
-    print("value,     time (ms), v. ratio, t. ratio")
-    print(f"{values[-1]:.2e}, {times[-1]:.4f},    N/A,      N/A")
-    for i in range(len(values)-2, -1, -1):
-        print(f"{values[i]:.2e}, {times[i]:.4f},    {values[i]/values[i+1]:.2e}, {times[i]/times[i+1]:.4f}")
+    print("\nUser test set 3 - Five numbers timed for scalability check.")
+    for case in benchmark_cases():
+        print_scaling(scaling(**case))
     print("You can see the time is rising so time complexity is > O(1), but way below linear < O(n).")
     print("This agrees with a time complexity of O(log n).")
 
+    # User Test Case 4 - All engines agree
+    print("\nUser test set 4 - All engines agree on small, perfect square and 4096-bit values.")
+    test = 0
+    big = (1 << 4096) - 1
+    for arg in list(range(100)) + [k ** 2 + d for k in range(2, 50) for d in (-1, 0, 1)] + [big, big // 3 + 7]:
+        test += 1
+        expected = isqrt(arg)
+        actual = [sqrt(arg, engine=engine) for engine in SQRT_ENGINES]
+        if actual != [expected] * len(SQRT_ENGINES):
+            print(f"Error test {test}: arg {arg}, expected {expected}, got {actual}.")
+            n_errors += 1
+    print(f"{test} values checked against math.isqrt.")
+
+    test += 1
+    try:
+        sqrt(4, engine="unknown")
+    except AttributeError:
+        print(f"Test {test} passed; unknown engine raised an AttributeError.")
+    else:
+        print(f"Error test {test}: expected an AttributeError exception.")
+        n_errors += 1
+
+    # User Test Case 5 - Engine timing on a 4096-bit value
+    print("\nUser test set 5 - Engine timing on a 4096-bit value executed 100 times.")
+    for engine in SQRT_ENGINES:
+        runtime = measure(sqrt, setup=lambda: (big, engine), repeat=1, number=100)["median_ns"] * 100 / 1e9
+        print(f"\t{engine:>6}: {runtime:.4f} seconds")
+
+    # User Test Case 6 - Batch square roots with an error mask
+    print("\nUser test set 6 - Batch square roots of lists and arrays, including values near 2^63 and 2^64.")
+    edges = [2 ** 63 - 1, 2 ** 63, 2 ** 64 - 1, (2 ** 32 - 1) ** 2, (2 ** 32 - 1) ** 2 - 1, 3037000499 ** 2]
+    valid = list(range(200)) + edges + [edge - d for edge in edges for d in range(1, 4)] + [big]
+    args = valid + [-1, 3.5, "4", None]
+    test = 0
+    for values in [args, array("Q", [v for v in valid if v < 2 ** 64]), array("q", [-5, 0, 2 ** 63 - 1])]:
+        test += 1
+        roots, errors = sqrt_many(values)
+        expected_errors = [not isinstance(v, int) or v < 0 for v in values]
+        expected_roots = [0 if error else isqrt(v) for v, error in zip(values, expected_errors)]
+        if list(roots) == expected_roots and list(errors) == expected_errors:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: the roots or error mask did not match math.isqrt.")
+            n_errors += 1
+
+    if np is not None:
+        for values in [np.array([-5, 0, 2 ** 63 - 1] + [v for v in valid if v < 2 ** 63], dtype=np.int64),
+                       np.array([v for v in valid if v < 2 ** 64], dtype=np.uint64)]:
+            test += 1
+            roots, errors = sqrt_many(values)
+            expected_errors = [int(v) < 0 for v in values]
+            expected_roots = [0 if error else isqrt(int(v)) for v, error in zip(values, expected_errors)]
+            if roots.tolist() == expected_roots and errors.tolist() == expected_errors:
+                print(f"Test {test} passed with NumPy {values.dtype}.")
+            else:
+                print(f"Error test {test}: the NumPy roots or error mask did not match math.isqrt.")
+                n_errors += 1
+
+        values = np.random.randint(0, 2 ** 63 - 1, size=10 ** 6, dtype=np.int64)
+        runtime = measure(sqrt_many, setup=lambda: (values,))["median_ns"] / 1e9
+        print(f"\t10^6 NumPy int64 roots in {runtime:.4f} seconds.")
+
+    test += 1
+    try:
+        # noinspection PyTypeChecker
+        sqrt_many("4")
+    except AttributeError:
+        print(f"Test {test} passed.")
+    else:
+        print(f"Error test {test}: expected an AttributeError exception.")
+        n_errors += 1
+
+    # User Test Case 7 - Cached square roots
+    print("\nUser test set 7 - Cached square roots with LRU eviction.")
+    test = 1
+    cache = SqrtCache(capacity=3, table_limit=10)
+    args = list(range(150)) + [10 ** 20, 10 ** 21, 10 ** 20, 10 ** 22, 10 ** 23, 10 ** 21]
+    actual = [cache(arg) for arg in args]
+    info = cache.cache_info()
+    if actual != [isqrt(arg) for arg in args]:
+        print(f"Error test {test}: the cached roots did not match math.isqrt.")
+        n_errors += 1
+    elif info != SqrtCacheInfo(hits=1, table_hits=100, misses=55, evictions=52, size=3, capacity=3):
+        print(f"Error test {test}: unexpected cache statistics {info}.")
+        n_errors += 1
+    else:
+        print(f"Test {test} passed; {info}.")
+
+    for arg in [-1, 3.5, 9.0, "4", None]:
+        test += 1
+        try:
+            cache(arg)
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    # User Test Case 8 - Parallel square roots
+    print("\nUser test set 8 - Parallel square roots of 4096-bit numbers match the serial path.")
+    test = 1
+    numbers = [big // (k + 1) for k in range(256)]
+    serial = [sqrt(number, engine="binary") for number in numbers]
+    actual = sqrt_parallel(numbers, chunk_size=16, engine="binary")
+    if actual == serial:
+        print(f"Test {test} passed.")
+    else:
+        print(f"Error test {test}: the parallel roots did not match the serial roots.")
+        n_errors += 1
+
+    for arg in [[4, -1], [4, 3.5], "4", None]:
+        test += 1
+        try:
+            # noinspection PyTypeChecker
+            sqrt_parallel(arg)
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    print("\tWorkers, time (s), speedup")
+    base_time = 0
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        runtime = measure(sqrt_parallel, setup=lambda: (numbers, 16, workers, "binary"), warmup=0,
+                          repeat=1)["median_ns"] / 1e9
+        base_time = base_time or runtime
+        print(f"\t{workers:>7}, {runtime:>9.3f}, {base_time/runtime:>7.2f}")
+        workers *= 2
+    print("The speedup should approach the number of workers, less the cost of starting the processes.")
+
     print("\n*******************")
     if n_errors > 0:
         raise RuntimeError(f"BOO HOO, {n_errors} errors detected.\n")
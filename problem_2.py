@@ -1,7 +1,27 @@
 #!/usr/bin/env python3
 
-from time import time
-from math import log2
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+import mmap
+import os
+import random
+from struct import Struct
+import sys
+import tempfile
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from benchmark import measure, print_scaling, scaling
 
 
 def binary_search(array: list, target: int, left_sorted: int, right_sorted: int, pivot: int) -> int:
@@ -89,7 +109,227 @@ def find_pivot(array: list, left: int, right: int) -> int:
     return find_pivot(array=array, left=mid, right=right)
 
 
-def rotated_array_search(input_list: list, number: int) -> int:
+def binary_search_iterative(array: list, target: int, left_sorted: int, right_sorted: int, pivot: int) -> int:
+    """Returns the index of the target in the array or -1 if not found, see `binary_search`.
+
+    This is the loop version of the recursive `binary_search`, so there is no function call, keyword argument or
+    `len` call per step and the index offset is applied with a subtraction instead of a modulo.
+
+    Args:
+       array (list): Rotated list of sorted integers
+       target (int): The number to search for
+       left_sorted (int): The left (min) most index of the array to search assuming the array was sorted
+       right_sorted (int): The right (max) most index of the array to search assuming the array was sorted
+       pivot (int): The pivot point that creates a fully sorted array
+
+    Returns:
+       int: Target index or -1
+    """
+    n_elements = len(array)
+    offset = pivot + 1
+    while left_sorted <= right_sorted:
+        mid_sorted = (left_sorted + right_sorted) // 2
+        mid = mid_sorted + offset
+        if mid >= n_elements:
+            mid -= n_elements
+        value = array[mid]
+        if value == target:
+            return mid
+        if value > target:
+            right_sorted = mid_sorted - 1
+        else:
+            left_sorted = mid_sorted + 1
+    return -1
+
+
+def find_pivot_iterative(array: list, left: int, right: int) -> int:
+    """Finds pivot point of the rotated sorted array, see `find_pivot`.
+
+    This is the loop version of the recursive `find_pivot`.
+
+    Args:
+       array (list): Rotated list of sorted integers
+       left (int): The left (min) most index of the array to search
+       right (int): The right (max) most index of the array to search
+
+    Returns:
+       int: Pivot index
+    """
+    first = array[0]
+    while array[right] <= array[left] and right - left > 1:
+        mid = (left + right) // 2
+        if array[mid] < first:
+            right = mid
+        else:
+            left = mid
+    if array[right] > array[left]:
+        return right
+    return left
+
+
+def find_pivot_duplicates(array: list) -> tuple:
+    """Finds pivot point of a rotated sorted array that may contain duplicates.
+
+    With duplicates, `find_pivot` can't tell which half holds the pivot when the middle element equals the end of the
+    range. This search compares the middle with the right end of the range instead. If they differ, half of the range
+    is dropped as usual. If they are equal, only the right end is dropped, which is a linear step. Runs of equal values
+    can therefore make the worst case O(n), e.g. [1, 1, 1, 0, 1, 1, 1], so the number of linear steps is returned.
+
+    Args:
+       array (list): Rotated list of sorted integers, possibly with duplicates
+
+    Returns:
+       (int),(int): Pivot index and the number of linear steps taken
+    """
+    left = 0
+    right = len(array) - 1
+    linear_steps = 0
+    while left < right:
+        mid = (left + right) // 2
+        if array[mid] > array[right]:
+            left = mid + 1
+        elif array[mid] < array[right]:
+            right = mid
+        elif array[right - 1] > array[right]:
+            # The right end is the first element in the sorted order
+            left = right
+        else:
+            right -= 1
+            linear_steps += 1
+
+    # The pivot is just left of the first element in the sorted order
+    return (left - 1) % len(array), linear_steps
+
+
+def rotated_bisect_left(array: list, target: int, pivot: int) -> int:
+    """Returns the sorted position of the first element >= target in a rotated sorted array, see `bisect.bisect_left`.
+
+    Args:
+       array (list): Rotated list of sorted integers
+       target (int): The number to search for
+       pivot (int): The pivot point that creates a fully sorted array
+
+    Returns:
+       int: Position in the sorted order, in [0, len(array)]
+    """
+    n_elements = len(array)
+    offset = pivot + 1
+    left = 0
+    right = n_elements
+    while left < right:
+        mid = (left + right) // 2
+        if array[(mid + offset) % n_elements] < target:
+            left = mid + 1
+        else:
+            right = mid
+    return left
+
+
+def rotated_bisect_right(array: list, target: int, pivot: int) -> int:
+    """Returns the sorted position of the first element > target in a rotated sorted array, see `bisect.bisect_right`.
+
+    Args:
+       array (list): Rotated list of sorted integers
+       target (int): The number to search for
+       pivot (int): The pivot point that creates a fully sorted array
+
+    Returns:
+       int: Position in the sorted order, in [0, len(array)]
+    """
+    n_elements = len(array)
+    offset = pivot + 1
+    left = 0
+    right = n_elements
+    while left < right:
+        mid = (left + right) // 2
+        if target < array[(mid + offset) % n_elements]:
+            right = mid
+        else:
+            left = mid + 1
+    return left
+
+
+# The selectable search engines as (find_pivot, binary_search) pairs with the same signatures
+SEARCH_ENGINES = {
+    "recursive": (find_pivot, binary_search),
+    "iterative": (find_pivot_iterative, binary_search_iterative),
+}
+
+
+def check_engine(engine: str):
+    """Checks that the given engine is one of the `SEARCH_ENGINES`.
+
+    Raises:
+        AttributeError: If the engine is unknown
+    """
+    if engine not in SEARCH_ENGINES:
+        raise AttributeError(f"The engine must be one of {', '.join(SEARCH_ENGINES)}.")
+
+
+class StructArray(Sequence):
+    """A read-only sequence of fixed-width integers stored in a buffer, such as an `mmap` of a file.
+
+    Elements are decoded with `struct` only when they are accessed, so a search only touches the pages it reads.
+    Native formats can also be read with `memoryview(buffer).cast(...)`, this class adds the explicit byte orders.
+    """
+
+    def __init__(self, buffer, fmt: str = "<q"):
+        """The object instantiation method.
+
+        Args:
+            buffer (bytes | mmap.mmap | memoryview): The buffer holding the integers.
+            fmt (str): The struct format of a single integer, e.g. "<q" for little-endian 64-bit integers.
+        """
+        self.buffer = buffer
+        self.struct = Struct(fmt)
+        self.length = len(buffer) // self.struct.size
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("StructArray index out of range")
+        return self.struct.unpack_from(self.buffer, index * self.struct.size)[0]
+
+
+def check_input_list(input_list: list):
+    """Checks that the given input list is a valid rotated array to search.
+
+    Any sequence of integers is valid, e.g. a list, `array.array`, `memoryview`, `StructArray` or NumPy array,
+    including a NumPy memmap.
+
+    Args:
+       input_list (list | numpy.ndarray): Rotated list of sorted integers
+
+    Raises:
+        AttributeError: If the input list is not a sequence or is empty
+    """
+    if isinstance(input_list, str) or \
+            not (isinstance(input_list, Sequence) or (np is not None and isinstance(input_list, np.ndarray))):
+        raise AttributeError("The input list must be a sequence such as a list, array or memoryview.")
+    if len(input_list) == 0:
+        raise AttributeError("The input list can't be empty.")
+
+
+def check_number(number: int):
+    """Checks that the given number is a valid search target.
+
+    Args:
+       number (int): The number to search for
+
+    Raises:
+        AttributeError: If the number is not an integer
+    """
+    if not isinstance(number, int):
+        raise AttributeError("The number must be an integer.")
+
+
+def rotated_array_search(input_list: list, number: int, engine: str = "iterative") -> int:
     """Finds the index by searching in a rotated sorted array with O(log n) runtime complexity.
 
     Assumptions:
@@ -97,8 +337,9 @@ def rotated_array_search(input_list: list, number: int) -> int:
         An empty input list raises an Attribute error
 
     Args:
-       input_list (list): Rotated list of sorted integers
+       input_list (list): Rotated list of sorted integers, or any sequence accepted by `check_input_list`
        number (int): The number to search for within the input array
+       engine (str): The search engine, "iterative" or the "recursive" reference
 
     Returns:
        int: Index or -1
@@ -108,23 +349,249 @@ def rotated_array_search(input_list: list, number: int) -> int:
     """
 
     # Check arguments
-    if not isinstance(number, int):
-        raise AttributeError("The number must be an integer.")
-    if not isinstance(input_list, list):
-        raise AttributeError("The input list must be an actual list.")
-    if len(input_list) == 0:
-        raise AttributeError("The input list can't be empty.")
+    check_number(number)
+    check_input_list(input_list)
+    check_engine(engine)
+    pivot_search, search = SEARCH_ENGINES[engine]
 
     # Find the pivot point
     n_elements = len(input_list)
-    pivot = find_pivot(array=input_list, left=0, right=n_elements-1)
+    pivot = pivot_search(input_list, 0, n_elements-1)
 
     # Now do a binary search for the desired number with a pivot offset to the indices
-    index = binary_search(array=input_list, target=number, left_sorted=0, right_sorted=n_elements-1, pivot=pivot)
+    index = search(input_list, number, 0, n_elements-1, pivot)
 
     return index
 
 
+def _numpy_search_many(array, numbers: list, pivot: int) -> list:
+    """The vectorized version of `rotated_array_search_many` for NumPy arrays."""
+    targets = np.asarray(numbers)
+    indices = np.full(len(targets), -1, dtype=np.int64)
+
+    # Search each sorted half of the array on either side of the pivot
+    for start, half in [(pivot + 1, array[pivot + 1:]), (0, array[:pivot + 1])]:
+        if len(half) == 0:
+            continue
+        positions = np.searchsorted(half, targets)
+        found = half[np.minimum(positions, len(half) - 1)] == targets
+        indices = np.where(found & (indices < 0), positions + start, indices)
+
+    return indices.tolist()
+
+
+def rotated_array_search_many(input_list: list, numbers: list) -> list:
+    """Finds the index of many numbers in a rotated sorted array, with a single pivot search and argument check.
+
+    The numbers are sorted once and swept in ascending order over the two sorted halves on either side of the pivot.
+    Since the numbers are ascending, each bisection starts where the previous one ended, like a merge of the numbers
+    into the array. NumPy arrays are searched with a vectorized `numpy.searchsorted` instead.
+    The time complexity is O(m log m + m log n) for m numbers.
+
+    Assumptions:
+        No duplicates in the array
+
+    Args:
+       input_list (list | numpy.ndarray): Rotated list of sorted integers
+       numbers (list): The numbers to search for within the input array
+
+    Returns:
+       list: The index of every number, or -1 if not found, in the same order as the numbers
+
+    Raises:
+        AttributeError: If the arguments are invalid
+    """
+
+    # Check arguments
+    check_input_list(input_list)
+    if np is not None and isinstance(numbers, np.ndarray):
+        if numbers.dtype.kind not in "iu":
+            raise AttributeError("The numbers must be integers.")
+    elif isinstance(numbers, list):
+        for number in numbers:
+            check_number(number)
+    else:
+        raise AttributeError("The numbers must be an actual list or a NumPy array.")
+
+    n_elements = len(input_list)
+    pivot = find_pivot_iterative(input_list, 0, n_elements - 1)
+    if np is not None and isinstance(input_list, np.ndarray):
+        return _numpy_search_many(input_list, numbers, pivot)
+
+    # The first half in the sorted order is right of the pivot, and all its elements are smaller than the second half
+    first_low = pivot + 1
+    second_low = 0
+    indices = [-1] * len(numbers)
+    for i in sorted(range(len(numbers)), key=numbers.__getitem__):
+        number = numbers[i]
+        if first_low < n_elements and number <= input_list[-1]:
+            first_low = bisect_left(input_list, number, first_low, n_elements)
+            position = first_low
+        else:
+            second_low = bisect_left(input_list, number, second_low, pivot + 1)
+            position = second_low
+        if position < n_elements and input_list[position] == number:
+            indices[i] = position
+
+    return indices
+
+
+class EqualRange(NamedTuple):
+    """The occurrences of a target in a rotated sorted array with duplicates, see `rotated_equal_range`."""
+    first: int
+    last: int
+    count: int
+    linear_steps: int
+
+
+def rotated_equal_range(input_list: list, number: int) -> EqualRange:
+    """Finds the first and last occurrence of a number in a rotated sorted array that may contain duplicates.
+
+    First and last refer to the sorted order, so the last occurrence can be at a lower index than the first if the run
+    of equal values wraps around the end of the array. The time complexity is O(log n), except when runs of equal values
+    hide the pivot. Those runs are scanned linearly, up to O(n) in the worst case, and the number of linear steps is
+    reported so the degenerate case can be monitored.
+
+    Args:
+       input_list (list): Rotated list of sorted integers, possibly with duplicates
+       number (int): The number to search for within the input array
+
+    Returns:
+       EqualRange: The first and last index, or -1 if not found, the count and the number of linear steps
+
+    Raises:
+        AttributeError: If the arguments are invalid
+    """
+
+    # Check arguments
+    check_number(number)
+    check_input_list(input_list)
+
+    pivot, linear_steps = find_pivot_duplicates(input_list)
+    start = rotated_bisect_left(input_list, number, pivot)
+    end = rotated_bisect_right(input_list, number, pivot)
+    if start == end:
+        return EqualRange(first=-1, last=-1, count=0, linear_steps=linear_steps)
+
+    n_elements = len(input_list)
+    return EqualRange(first=(start + pivot + 1) % n_elements, last=(end + pivot) % n_elements, count=end - start,
+                      linear_steps=linear_steps)
+
+
+class RotatedSortedIndex:
+    """A search index over a rotated sorted array that finds the pivot once and reuses it for every search.
+
+    Positions are logical positions in the sorted order, i.e. position 0 is the smallest element. The array isn't
+    copied, so it must not be changed except by rotating it in place and then calling `rotate`.
+
+    Assumptions:
+        No duplicates in the array, unless created with duplicates=True
+    """
+
+    def __init__(self, input_list: list, engine: str = "iterative", duplicates: bool = False):
+        """The object instantiation method, finds the pivot in O(log n) time.
+
+        Args:
+           input_list (list): Rotated list of sorted integers
+           engine (str): The search engine, "iterative" or the "recursive" reference
+           duplicates (bool): Allow duplicates, the pivot search is then O(n) in the worst case, see
+               `find_pivot_duplicates`, and searches return the first occurrence in the sorted order.
+
+        Raises:
+            AttributeError: If the input list is not a list or is empty or the engine is unknown
+        """
+        check_input_list(input_list)
+        check_engine(engine)
+        pivot_search, self.binary_search = SEARCH_ENGINES[engine]
+        self.array = input_list
+        self.duplicates = duplicates
+        if duplicates:
+            self.pivot, self.linear_steps = find_pivot_duplicates(input_list)
+        else:
+            self.pivot = pivot_search(input_list, 0, len(input_list) - 1)
+            self.linear_steps = 0
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __contains__(self, number: int) -> bool:
+        return self.contains(number)
+
+    def index(self, position: int) -> int:
+        """Returns the array index of the given logical position in the sorted order."""
+        return (position + self.pivot + 1) % len(self.array)
+
+    def rotate(self, shift: int):
+        """Updates the pivot in O(1) after the array was rotated in place.
+
+        Args:
+            shift (int): The number of positions the array was rotated to the right, i.e. the element at index i moved
+                to index (i + shift) % n. Negative shifts are rotations to the left.
+        """
+        self.pivot = (self.pivot + shift) % len(self.array)
+
+    def search(self, number: int) -> int:
+        """Returns the index of the number in the array or -1 if not found, in O(log n) time.
+
+        Raises:
+            AttributeError: If the number is not an integer
+        """
+        check_number(number)
+        if self.duplicates:
+            position = rotated_bisect_left(self.array, number, self.pivot)
+            if position < len(self.array) and self.array[self.index(position)] == number:
+                return self.index(position)
+            return -1
+        return self.binary_search(self.array, number, 0, len(self.array) - 1, self.pivot)
+
+    def search_many(self, numbers: list) -> list:
+        """Returns the index of every number in the array, -1 for the numbers that were not found.
+
+        Raises:
+            AttributeError: If any number is not an integer
+        """
+        return [self.search(number) for number in numbers]
+
+    def contains(self, number: int) -> bool:
+        """Returns True if the number is in the array.
+
+        Raises:
+            AttributeError: If the number is not an integer
+        """
+        return self.search(number) != -1
+
+    def bisect_left(self, number: int) -> int:
+        """Returns the logical position where the number would be inserted to keep the order, left of equal elements.
+
+        Raises:
+            AttributeError: If the number is not an integer
+        """
+        check_number(number)
+        return rotated_bisect_left(self.array, number, self.pivot)
+
+    def bisect_right(self, number: int) -> int:
+        """Returns the logical position where the number would be inserted to keep the order, right of equal elements.
+
+        Raises:
+            AttributeError: If the number is not an integer
+        """
+        check_number(number)
+        return rotated_bisect_right(self.array, number, self.pivot)
+
+    def equal_range(self, number: int) -> EqualRange:
+        """Returns the first and last occurrence of the number in the sorted order, see `rotated_equal_range`.
+
+        Raises:
+            AttributeError: If the number is not an integer
+        """
+        start = self.bisect_left(number)
+        end = self.bisect_right(number)
+        if start == end:
+            return EqualRange(first=-1, last=-1, count=0, linear_steps=self.linear_steps)
+        return EqualRange(first=self.index(start), last=self.index(end - 1), count=end - start,
+                          linear_steps=self.linear_steps)
+
+
 def linear_search(input_list: list, number: int) -> int:
     for index, element in enumerate(input_list):
         if element == number:
@@ -143,6 +610,128 @@ def test_function(test_case: list):
         print(f"Fail; expected = {expected}, actual = {actual}")
 
 
+def rotated_range(n_elements: int) -> list:
+    """Returns the list [1, 2, ..., n_elements - 1, 0], which has its pivot at n_elements - 2."""
+    array = list(range(1, n_elements))
+    array.append(0)
+    return array
+
+
+def benchmark_cases() -> list:
+    """The scaling benchmark cases of this problem, see `benchmark.scaling`.
+
+    Returns:
+        list: The keyword arguments of every scaling benchmark.
+    """
+    sizes = [10 ** e for e in range(6, 9)]
+    return [
+        dict(name="problem_2.find_pivot", func=find_pivot, setup=lambda n: (rotated_range(n), 0, n - 1),
+             sizes=sizes, expected="O(log n)", repeat=3, number=1000),
+        dict(name="problem_2.binary_search", func=binary_search, setup=lambda n: (list(range(n)), 0, 0, n - 1, n - 1),
+             sizes=sizes, expected="O(log n)", repeat=3, number=1000),
+        dict(name="problem_2.rotated_array_search", func=rotated_array_search, setup=lambda n: (rotated_range(n), 0),
+             sizes=sizes, expected="O(log n)", repeat=3, number=1000),
+    ]
+
+
+def compare_engines(exponents: range = range(3, 9), number: int = 1000) -> list:
+    """Microbenchmark of the recursive and iterative find_pivot and binary_search on the same arrays.
+
+    Args:
+        exponents (range): The arrays have 10^e elements for every exponent e.
+        number (int): The number of calls timed per function and size.
+
+    Returns:
+        list: The (size, recursive pivot, iterative pivot, recursive search, iterative search) times in ns per call.
+    """
+    rows = []
+    for e in exponents:
+        n = 10 ** e
+        array = rotated_range(n)
+        row = [n]
+        for pivot_search, _ in SEARCH_ENGINES.values():
+            row.append(measure(pivot_search, setup=lambda: (array, 0, n - 1), number=number)["median_ns"])
+        for _, search in SEARCH_ENGINES.values():
+            row.append(measure(search, setup=lambda: (array, 1, 0, n - 1, n - 2), number=number)["median_ns"])
+        rows.append(row)
+        del array
+
+    print("\t    Size | pivot rec. (us) | pivot iter. (us) | speedup | search rec. (us) | search iter. (us) | speedup")
+    for n, pivot_rec, pivot_iter, search_rec, search_iter in rows:
+        print(f"\t{n:>8.0e} | {pivot_rec / 1e3:>15.2f} | {pivot_iter / 1e3:>16.2f} | {pivot_rec / pivot_iter:>7.2f} | "
+              f"{search_rec / 1e3:>16.2f} | {search_iter / 1e3:>17.2f} | {search_rec / search_iter:>7.2f}")
+    return rows
+
+
+def int64_buffers(values: list) -> list:
+    """Returns the values as every kind of sequence-like buffer of 64-bit integers that the searches accept."""
+    native = array("q", values)
+    swapped = array("q", values)
+    swapped.byteswap()
+    buffers = [native, memoryview(native.tobytes()).cast("q"), StructArray(native.tobytes(), "=q"),
+               StructArray(swapped.tobytes(), ">q" if sys.byteorder == "little" else "<q")]
+    if np is not None:
+        buffers.append(np.array(values, dtype=np.int64))
+    return buffers
+
+
+def page_faults() -> tuple:
+    """Returns the (minor, major) page faults of this process so far, or (0, 0) if they can't be measured."""
+    if resource is None:
+        return 0, 0
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_minflt, usage.ru_majflt
+
+
+def benchmark_mmap_search(n_elements: int = 10 ** 7, n_searches: int = 1000):
+    """Measures the page faults and latency of searching a rotated array in a memory-mapped file on local disk.
+
+    Each search is done on a freshly mapped file so its pages are faulted in again. Major faults only occur if the file
+    isn't in the page cache, the minor faults show the number of pages a search touches.
+
+    Args:
+        n_elements (int): The number of 64-bit integers in the file.
+        n_searches (int): The number of searches to average over.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rotated.bin")
+        with open(path, "wb") as file:
+            array("q", rotated_range(n_elements)).tofile(file)
+        print(f"\tFile of {n_elements:.0e} int64 values, {os.path.getsize(path) / 2 ** 20:.0f} MiB, "
+              f"{n_searches} searches.")
+
+        print("\t       Buffer | latency (us) | minor faults / search | major faults / search")
+        readers = [("memoryview", lambda buffer: memoryview(buffer).cast("q")),
+                   ("StructArray", lambda buffer: StructArray(buffer, "=q"))]
+        if np is not None:
+            readers.append(("numpy.memmap", None))
+        for name, reader in readers:
+            targets = [random.randrange(n_elements) for _ in range(n_searches)]
+            total_ns = 0
+            minor = major = 0
+            with open(path, "rb") as file:
+                for target in targets:
+                    if reader is None:
+                        buffer = sequence = np.memmap(file, dtype=np.int64, mode="r")
+                    else:
+                        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                        sequence = reader(buffer)
+                    faults = page_faults()
+                    total_ns += measure(rotated_array_search, setup=lambda: (sequence, target), warmup=0,
+                                        repeat=1)["median_ns"]
+                    minor += page_faults()[0] - faults[0]
+                    major += page_faults()[1] - faults[1]
+                    if isinstance(sequence, memoryview):
+                        sequence.release()
+                    del sequence
+                    if reader is not None:
+                        buffer.close()
+                    del buffer
+            print(f"\t{name:>13} | {total_ns / n_searches / 1e3:>12.1f} | {minor / n_searches:>21.1f} | "
+                  f"{major / n_searches:>21.2f}")
+    print("\tA search touches O(log n) pages, far fewer than the whole file.")
+
+
 def given_tests():
     test_function([[6, 7, 8, 9, 10, 1, 2, 3, 4], 6])
     test_function([[6, 7, 8, 9, 10, 1, 2, 3, 4], 1])
@@ -164,8 +753,8 @@ def user_tests():
     for array, expected in [([4, 6, 7, 0, 1, 2], 2), ([4, 5, 6, 7, 1, 2], 3), ([4, 5, 0], 1), ([2, 5, 8], 2),
                             ([8, 1, 5], 0)]:
         test += 1
-        actual = find_pivot(array=array, left=0, right=len(array)-1)
-        if actual == expected:
+        actual = [pivot_search(array, 0, len(array)-1) for pivot_search, _ in SEARCH_ENGINES.values()]
+        if actual == [expected] * len(SEARCH_ENGINES):
             print(f"Test {test} passed.")
         else:
             print(f"Error test {test}: expected {expected}, but got {actual}.")
@@ -177,8 +766,8 @@ def user_tests():
     for array, target, expected in [([1, 2, 3, 4, 6, 7, 8, 9, 10], 1, 0), ([1, 3], 1, 0), ([1, 3], 3, 1), ([3], 3, 0),
                                     ([1, 3, 7], 9, -1)]:
         test += 1
-        actual = binary_search(array=array, target=target, left_sorted=0, right_sorted=len(array)-1, pivot=len(array)-1)
-        if actual == expected:
+        actual = [search(array, target, 0, len(array)-1, len(array)-1) for _, search in SEARCH_ENGINES.values()]
+        if actual == [expected] * len(SEARCH_ENGINES):
             print(f"Test {test} passed.")
         else:
             print(f"Error test {test}: expected {expected}, but got {actual}.")
@@ -210,87 +799,189 @@ def user_tests():
             print(f"Error test {test}: expected an AttributeError exception.")
             n_errors += 1
 
-    # User Test Case 4 - Scaling test of find_pivot
-    print("\nUser test set 4 - find_pivot log n runtime complexity check.")
-    times = []
-    e_values = [6 + i for i in range(3)]
+    # User Test Case 4 - Scaling tests of find_pivot, binary_search and rotated_array_search
+    print("\nUser test set 4 - find_pivot, binary_search and rotated_array_search log n runtime complexity check.")
     test = 0
-    for e in e_values:
+    array = rotated_range(10 ** 6)
+    for name, actual, expected in [
+            ("find_pivot", find_pivot(array=array, left=0, right=len(array) - 1), len(array) - 2),
+            ("binary_search", binary_search(array=array, target=0, left_sorted=0, right_sorted=len(array) - 1,
+                                            pivot=len(array) - 2), len(array) - 1),
+            ("rotated_array_search", rotated_array_search(input_list=array, number=0), len(array) - 1)]:
         test += 1
-        array = [i for i in range(1, 10 ** e)] + [0]
-        expected = 10 ** e - 2
-        start_time = time()
-        for _ in range(1000):
-            actual = find_pivot(array=array, left=0, right=len(array) - 1)
-        times.append(time() - start_time)
         if actual == expected:
-            print(f"\tTest {test} passed in {times[-1]:.4f} seconds.")
+            print(f"\tTest {test} passed for {name}.")
         else:
-            print(f"\tError test {test}: expected {expected}, but got {actual}.")
+            print(f"\tError test {test}: {name} expected {expected}, but got {actual}.")
             n_errors += 1
-        del array
+    del array
 
-    print("\tSize, time (ms),    n, log n, actual scaled time ")
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        print(f"\t10^{e_values[i]},     {times[i]:.3f}, {n:>4},  {log2(n):>4.1f}, {times[i]/times[0]:>6.1f}")
+    for case in benchmark_cases():
+        print_scaling(scaling(**case))
     print("You can see the time is rising so time complexity is > O(1), but way below linear < O(n).")
     print("This agrees with a time complexity of O(log n).")
 
-    # User Test Case 5 - Scaling test of binary_search
-    print("\nUser test set 5 - binary_search log n runtime complexity check.")
-    times = []
-    e_values = [6 + i for i in range(3)]
+    # Test set 5 - Recursive versus iterative engines
+    print("\nUser test set 5 - Recursive versus iterative engines microbenchmark.")
+    compare_engines()
+
+    # Test set 6 - The reusable rotated sorted index
+    print("\nUser test set 6 - Testing the rotated sorted index, including in place re-rotation.")
     test = 0
-    expected = 0
-    for e in e_values:
+    sorted_array = [2 * i for i in range(10)]
+    for shift in range(len(sorted_array)):
         test += 1
-        array = [i for i in range(10 ** e)]
-        start_time = time()
-        for _ in range(1000):
-            actual = binary_search(array=array, target=0, left_sorted=0, right_sorted=len(array) - 1,
-                                   pivot=len(array)-1)
-        times.append(time() - start_time)
-        if actual == expected:
-            print(f"\tTest {test} passed in {times[-1]:.4f} seconds.")
+        array = sorted_array[shift:] + sorted_array[:shift]
+        index = RotatedSortedIndex(array, engine=list(SEARCH_ENGINES)[shift % 2])
+        targets = list(range(-1, 21))
+        for step in range(3):
+            actual = (index.search_many(targets), [t in index for t in targets],
+                      [index.bisect_left(t) for t in targets], [index.bisect_right(t) for t in targets])
+            expected = ([linear_search(array, t) for t in targets], [t in array for t in targets],
+                        [bisect_left(sorted_array, t) for t in targets],
+                        [bisect_right(sorted_array, t) for t in targets])
+            if actual != expected:
+                print(f"Error test {test}: shift {shift}, rotation step {step} did not match the linear search.")
+                n_errors += 1
+                break
+            array[:] = array[-3:] + array[:-3]
+            index.rotate(3)
+        else:
+            print(f"Test {test} passed.")
+
+    test += 1
+    try:
+        RotatedSortedIndex([1, 2, 3]).search("4")
+    except AttributeError:
+        print(f"Test {test} passed.")
+    else:
+        print(f"Error test {test}: expected an AttributeError exception.")
+        n_errors += 1
+
+    # Test set 7 - Duplicates
+    print("\nUser test set 7 - Testing equal ranges in rotated arrays with duplicates.")
+    test = 0
+    n_degenerate = 0
+    for sorted_array in [[1, 1, 1, 1, 1, 1, 1, 0], [0, 1, 1, 1, 1, 1, 1, 1], [0, 0, 1, 1, 2, 2, 2, 3, 5, 5, 5, 5],
+                         [7], [4, 4], [1, 2, 2, 2, 2, 2, 2, 2, 2, 3]]:
+        sorted_array = sorted(sorted_array)
+        for shift in range(len(sorted_array)):
+            test += 1
+            array = sorted_array[shift:] + sorted_array[:shift]
+            pivot, _ = find_pivot_duplicates(array)
+            logical = array[pivot + 1:] + array[:pivot + 1]
+            expected = []
+            actual = []
+            for target in range(-1, 8):
+                positions = [(i + pivot + 1) % len(array) for i, v in enumerate(logical) if v == target]
+                expected.append((positions[0], positions[-1], len(positions)) if positions else (-1, -1, 0))
+                result = rotated_equal_range(input_list=array, number=target)
+                actual.append(result[:3])
+                n_degenerate += result.linear_steps > 0
+            index = RotatedSortedIndex(array, duplicates=True)
+            if logical != sorted_array or actual != expected or \
+                    [index.equal_range(t)[:3] for t in range(-1, 8)] != expected or \
+                    [index.search(t) for t in range(-1, 8)] != [e[0] for e in expected]:
+                print(f"Error test {test}: {array} did not match the expected equal ranges.")
+                n_errors += 1
+    print(f"{test} rotations checked, {n_degenerate} searches hit the degenerate linear case.")
+
+    # Test set 8 - Batch search
+    print("\nUser test set 8 - Testing the batch search of many numbers.")
+    test = 0
+    sorted_array = [3 * i for i in range(20)]
+    numbers = [random.randint(-5, 62) for _ in range(200)]
+    for shift in range(len(sorted_array)):
+        test += 1
+        array = sorted_array[shift:] + sorted_array[:shift]
+        expected = [linear_search(array, number) for number in numbers]
+        actual = [rotated_array_search_many(input_list=array, numbers=numbers)]
+        if np is not None:
+            actual.append(rotated_array_search_many(input_list=np.array(array), numbers=numbers))
+        if actual == [expected] * len(actual):
+            print(f"Test {test} passed.")
         else:
-            print(f"\tError test {test}: expected {expected}, but got {actual}.")
+            print(f"Error test {test}: the batch search did not match the linear search.")
             n_errors += 1
-        del array
 
-    print("\tSize, time (ms),    n, log n, actual scaled time ")
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        print(f"\t10^{e_values[i]},     {times[i]:.3f}, {n:>4},  {log2(n):>4.1f}, {times[i]/times[0]:>6.1f}")
-    print("You can see the time is rising so time complexity is > O(1), but way below linear < O(n).")
-    print("This agrees with a time complexity of O(log n).")
+    for array, numbers in [(None, [1]), ([1, 2], [1.5]), ([1, 2], "1")]:
+        test += 1
+        try:
+            # noinspection PyTypeChecker
+            rotated_array_search_many(input_list=array, numbers=numbers)
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
 
-    # User Test Case 6 - Scaling test of rotated_array_search
-    print("\nUser test set 6 - rotated_array_search log n runtime complexity check.")
-    times = []
-    e_values = [6 + i for i in range(3)]
+    array = rotated_range(10 ** 7)
+    numbers = [random.randrange(10 ** 7) for _ in range(10 ** 5)]
+    single = measure(lambda: [rotated_array_search(array, number) for number in numbers], warmup=0, repeat=1)
+    batch = measure(rotated_array_search_many, setup=lambda: (array, numbers), warmup=0, repeat=1)
+    print(f"\t10^5 searches in 10^7 elements: one at a time {single['median_ns'] / 1e9:.3f} s, "
+          f"batch {batch['median_ns'] / 1e9:.3f} s")
+    if np is not None:
+        array = np.array(array)
+        batch = measure(rotated_array_search_many, setup=lambda: (array, numbers), warmup=0, repeat=1)
+        print(f"\t10^5 searches in 10^7 elements with NumPy {batch['median_ns'] / 1e9:.3f} s")
+    del array
+
+    # Test set 9 - Sequence-like buffers
+    print("\nUser test set 9 - Testing searches in arrays, memoryviews, struct arrays and memory-mapped files.")
     test = 0
-    for e in e_values:
+    sorted_array = [5 * i - 50 for i in range(30)]
+    numbers = list(range(-55, 105, 5)) + [1, 7]
+    for shift in [0, 1, 13, 29]:
+        array_list = sorted_array[shift:] + sorted_array[:shift]
+        buffers = int64_buffers(array_list)
+        expected = [linear_search(array_list, number) for number in numbers]
+        for buffer in buffers:
+            test += 1
+            actual = [rotated_array_search(buffer, number) for number in numbers]
+            if actual == expected and rotated_array_search_many(buffer, numbers) == expected:
+                print(f"Test {test} passed for {type(buffer).__name__}.")
+            else:
+                print(f"Error test {test}: {type(buffer).__name__} did not match the linear search.")
+                n_errors += 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shift in [0, 1, 13]:
+            array_list = sorted_array[shift:] + sorted_array[:shift]
+            path = os.path.join(directory, f"rotated_{shift}.bin")
+            with open(path, "wb") as file:
+                file.write(Struct(f"={len(array_list)}q").pack(*array_list))
+            expected = [linear_search(array_list, number) for number in numbers]
+            with open(path, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                view = memoryview(mapped).cast("q")
+                sequences = [("mmap memoryview", view), ("mmap StructArray", StructArray(mapped, "=q"))]
+                if np is not None:
+                    sequences.append(("numpy.memmap", np.memmap(file, dtype=np.int64, mode="r")))
+                for name, sequence in sequences:
+                    test += 1
+                    actual = [rotated_array_search(sequence, number) for number in numbers]
+                    if actual == expected and rotated_array_search_many(sequence, numbers) == expected:
+                        print(f"Test {test} passed for {name}.")
+                    else:
+                        print(f"Error test {test}: {name} did not match the linear search.")
+                        n_errors += 1
+                del sequences, sequence
+                view.release()
+                mapped.close()
+
+    for arg in ["1234", b"", {1: 2}]:
         test += 1
-        array = [i for i in range(1, 10 ** e)] + [0]
-        expected = 10 ** e - 1
-        start_time = time()
-        for _ in range(1000):
-            actual = rotated_array_search(input_list=array, number=0)
-        times.append(time() - start_time)
-        if actual == expected:
-            print(f"\tTest {test} passed in {times[-1]:.4f} seconds.")
+        try:
+            # noinspection PyTypeChecker
+            rotated_array_search(input_list=arg, number=1)
+        except AttributeError:
+            print(f"Test {test} passed.")
         else:
-            print(f"\tError test {test}: expected {expected}, but got {actual}.")
+            print(f"Error test {test}: expected an AttributeError exception.")
             n_errors += 1
-        del array
 
-    print("\tSize, time (ms),    n, log n, actual scaled time ")
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        print(f"\t10^{e_values[i]},     {times[i]:.3f}, {n:>4},  {log2(n):>4.1f}, {times[i]/times[0]:>6.1f}")
-    print("You can see the time is rising so time complexity is > O(1), but way below linear < O(n).")
-    print("This agrees with a time complexity of O(log n).")
+    benchmark_mmap_search()
 
     print("\n*******************")
     if n_errors > 0:
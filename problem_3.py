@@ -1,9 +1,34 @@
 #!/usr/bin/env python3
 
-from math import log2
+from array import array as typed_array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from heapq import merge as heap_merge
+import io
+from itertools import islice
+from multiprocessing.shared_memory import SharedMemory
+import os
 import random
-from time import time
-from typing import Tuple
+import tempfile
+from time import perf_counter_ns
+from typing import NamedTuple, Tuple
+
+from benchmark import measure, print_scaling, scaling
+
+# Python limits int(str) to 4300 digits by default, so longer numbers are converted in blocks of this size
+MAX_STR_DIGITS = 4000
+
+DIGITS = "0123456789"
+
+# Runs up to this size are sorted with an insertion sort before the bottom-up merge sort starts merging
+INSERTION_SORT_SIZE = 32
+
+# The approximate bytes per value while a run is sorted in memory: a list slot, the int object and a merge buffer slot
+RUN_BYTES_PER_VALUE = 48
+
+# The `array` typecodes of the integer types that external_sort can write to a binary file
+INTEGER_TYPECODES = frozenset("bBhHiIlLqQ")
 
 
 def merge(array: list, left: int, mid: int, right: int):
@@ -59,36 +84,382 @@ def mergesort(array: list, left: int, right: int):
     merge(array=array, left=left, mid=mid, right=right)
 
 
-def rearrange_digits(array: list) -> Tuple[int, int]:
-    """Rearrange Array Elements to form two number such that their sum is maximum with O(nlog n) time complexity.
+def insertion_sort(array: list, left: int, right: int):
+    """Sorts the array within left and right in place with an insertion sort, which is fast for short runs.
 
-    Example:
-        Given: [1, 2, 3, 4, 5]
-        Result: [531, 42] or [542, 31]
-        Max Sum: 573 for both so either may be returned
+    Args:
+        array (list): The array containing the sub array to sort.
+        left (int): Start of the sub array to sort.
+        right (int): End of the sub array to sort.
+    """
+    for i in range(left + 1, right + 1):
+        value = array[i]
+        j = i - 1
+        while j >= left and array[j] > value:
+            array[j + 1] = array[j]
+            j -= 1
+        array[j + 1] = value
 
-    Assumptions:
-        1. All array elements are in the range [0, 9]
+
+def merge_into(source: list, target: list, left: int, mid: int, right: int, offset: int):
+    """Merges the sorted runs source[left:mid] and source[mid:right] into target[left - offset:right - offset].
+
+    Unlike `merge`, the output is written straight into the target element by element, so nothing is allocated per
+    merge, not even a slice copy of the leftover run.
 
     Args:
-       array (list of int): Input List
+        source (list): The array containing the two sorted runs.
+        target (list): The array to write the merged run to.
+        left (int): Start of the first run.
+        mid (int): Start of the second run and the end (exclusive) of the first run.
+        right (int): End (exclusive) of the second run.
+        offset (int): The target index is the source index minus this offset.
+    """
+
+    i = left
+    j = mid
+    k = left - offset
+
+    # Skip the comparisons if the runs are already in order
+    if mid < right and source[mid] < source[mid - 1]:
+        while i < mid and j < right:
+            if source[j] < source[i]:
+                target[k] = source[j]
+                j += 1
+            else:
+                target[k] = source[i]
+                i += 1
+            k += 1
+
+    # Copy whatever is left of the runs, at most one of them still has elements unless they were already in order
+    while i < mid:
+        target[k] = source[i]
+        i += 1
+        k += 1
+    while j < right:
+        target[k] = source[j]
+        j += 1
+        k += 1
+
+
+def mergesort_bottom_up(array: list, left: int, right: int):
+    """Sorts the array within left and right with an iterative, bottom-up merge sort.
+
+    Runs of `INSERTION_SORT_SIZE` are first sorted in place with an insertion sort. The runs are then merged in passes
+    of doubling width, ping-ponging between the array and a single buffer of the same size, so there is no recursion
+    and one auxiliary allocation instead of a new output list per merge. The sort is stable.
+
+    Args:
+        array (list): The array containing the sub array to sort.
+        left (int): Start of the sub array to sort.
+        right (int): End of the sub array to sort.
+    """
+    if left >= right:
+        return
+
+    end = right + 1
+    for start in range(left, end, INSERTION_SORT_SIZE):
+        insertion_sort(array, start, min(start + INSERTION_SORT_SIZE, end) - 1)
+    if end - left <= INSERTION_SORT_SIZE:
+        return
+
+    # The buffer holds the range at index - left, so the source offset flips sign with every pass
+    buffer = [0] * (end - left)
+    source, target, offset = array, buffer, left
+    width = INSERTION_SORT_SIZE
+    while width < end - left:
+        start = left if source is array else 0
+        stop = end if source is array else end - left
+        for lo in range(start, stop, 2 * width):
+            merge_into(source, target, lo, min(lo + width, stop), min(lo + 2 * width, stop), offset)
+        source, target, offset = target, source, -offset
+        width *= 2
+
+    if source is buffer:
+        array[left:end] = buffer
+
+
+def _sort_chunk(chunk: list) -> list:
+    """Sorts a pickled chunk in a worker process."""
+    mergesort_bottom_up(chunk, 0, len(chunk) - 1)
+    return chunk
+
+
+def _sort_shared_chunk(name: str, typecode: str, start: int, stop: int):
+    """Sorts the items [start, stop) of a shared memory block in place in a worker process."""
+    shared = SharedMemory(name=name)
+    try:
+        view = shared.buf.cast(typecode)
+        try:
+            chunk = view[start:stop].tolist()
+            mergesort_bottom_up(chunk, 0, len(chunk) - 1)
+            view[start:stop] = typed_array(typecode, chunk)
+        finally:
+            view.release()
+    finally:
+        shared.close()
+
+
+def mergesort_parallel(array: list, left: int, right: int, max_workers: int | None = None, typecode: str = "q",
+                       min_parallel_size: int = 10 ** 5):
+    """Sorts the array within left and right by sorting chunks in parallel processes and merging them.
+
+    The range is split into one chunk per worker, and each worker sorts its chunk with `mergesort_bottom_up`. If all
+    the values fit the `array` typecode, the range is copied once into shared memory and the workers sort their chunks
+    in place there, so the values aren't pickled. Otherwise, the chunks are pickled to and from the workers. The sorted
+    chunks are then combined with a heap-based k-way merge.
+
+    Args:
+        array (list): The array containing the sub array to sort.
+        left (int): Start of the sub array to sort.
+        right (int): End of the sub array to sort.
+        max_workers (int | None): The number of worker processes, defaults to the number of CPUs.
+        typecode (str): The `array` typecode used to share the values, "q" for 64-bit integers.
+        min_parallel_size (int): Smaller ranges are sorted serially, since starting processes costs more than it saves.
+    """
+    n_elements = right - left + 1
+    n_workers = max_workers or os.cpu_count() or 1
+    if n_elements < max(min_parallel_size, 2) or n_workers == 1:
+        mergesort_bottom_up(array, left, right)
+        return
+
+    bounds = [n_elements * i // n_workers for i in range(n_workers + 1)]
+    try:
+        values = typed_array(typecode, array[left:right + 1])
+    except (OverflowError, TypeError):
+        values = None
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        if values is None:
+            chunks = list(executor.map(_sort_chunk, [array[left + a:left + b] for a, b in zip(bounds, bounds[1:])]))
+            array[left:right + 1] = heap_merge(*chunks)
+            return
+
+        shared = SharedMemory(create=True, size=n_elements * values.itemsize)
+        try:
+            try:
+                view = shared.buf.cast(typecode)
+                try:
+                    view[:] = values
+                    del values
+                    list(executor.map(_sort_shared_chunk, [shared.name] * n_workers, [typecode] * n_workers,
+                                      bounds[:-1], bounds[1:]))
+                    array[left:right + 1] = heap_merge(*[view[a:b] for a, b in zip(bounds, bounds[1:])])
+                finally:
+                    # The view must be released before closing, and the block is unlinked even if closing fails
+                    view.release()
+            finally:
+                shared.close()
+        finally:
+            shared.unlink()
+
+
+class ExternalSortStats(NamedTuple):
+    """The statistics returned by `external_sort`.
+
+    The phases map "runs" and "merge" to their number of bytes written, their time in seconds and their throughput in
+    bytes per second. The merge phase includes every pass over the data.
+    """
+    n_values: int
+    n_runs: int
+    n_merge_passes: int
+    phases: dict
+
+
+def read_typed_chunks(file, typecode: str, chunk_size: int):
+    """Reads a binary file of `array` items in chunks of at most `chunk_size` items.
+
+    Args:
+        file (binary file): The file to read from its current position.
+        typecode (str): The `array` typecode of the items.
+        chunk_size (int): The maximum number of items per chunk.
+
+    Yields:
+        array: The next chunk of items.
+
+    Raises:
+        AttributeError: If the file size isn't a multiple of the item size.
+    """
+    itemsize = typed_array(typecode).itemsize
+    while data := file.read(chunk_size * itemsize):
+        if len(data) % itemsize:
+            raise AttributeError(f"The file size must be a multiple of the item size {itemsize}.")
+        chunk = typed_array(typecode)
+        chunk.frombytes(data)
+        yield chunk
+
+
+def merge_run_files(paths: list, output, typecode: str, buffer_size: int, progress=None, done: int = 0) -> int:
+    """Merges sorted run files with `write_merged`, reading each run `buffer_size` items at a time, and deletes them.
 
     Returns:
-       (int),(int): Two maximum sums
+        int: The number of bytes written.
+    """
+    files = [open(path, "rb") for path in paths]
+    try:
+        runs = [(value for chunk in read_typed_chunks(file, typecode, buffer_size) for value in chunk)
+                for file in files]
+        return write_merged(runs, output, typecode, buffer_size, progress=progress, done=done)
+    finally:
+        for file in files:
+            file.close()
+            os.remove(file.name)
+
+
+def write_merged(runs: list, output, typecode: str, buffer_size: int, progress=None, done: int = 0) -> int:
+    """Merges sorted runs with a heap-based k-way merge and writes the result in blocks of `buffer_size` items.
+
+    Args:
+        runs (list): The sorted iterables to merge, ties are taken from the earlier run first.
+        output (binary file): The file the merged items are written to.
+        typecode (str): The `array` typecode of the items.
+        buffer_size (int): The number of items written at a time.
+        progress (callable | None): Called with "merge" and the number of bytes written so far after every block.
+        done (int): The number of bytes written by earlier merges of the same phase, added to the progress.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    merged = heap_merge(*runs)
+    n_bytes = 0
+    while block := typed_array(typecode, islice(merged, buffer_size)):
+        block.tofile(output)
+        n_bytes += len(block) * block.itemsize
+        if progress:
+            progress("merge", done + n_bytes)
+    return n_bytes
+
+
+def external_sort(source, output, memory_budget: int = 1 << 26, typecode: str = "q", temp_dir: str | None = None,
+                  fan_in: int = 16, progress=None) -> ExternalSortStats:
+    """Stably sorts integers that don't fit in memory with an external merge sort.
+
+    The source is read in runs that fit the memory budget, each run is sorted with `mergesort_bottom_up` and spilled
+    to a temporary file as raw `array` items. The runs are then merged `fan_in` at a time with a heap-based k-way merge,
+    in as many passes as needed, and the last pass writes to the output. Every run is read through a buffer, so a merge
+    pass holds `fan_in + 1` buffers in memory.
+
+    Args:
+        source (iterable of int | binary file): The values, or a binary file of `array` items of the typecode.
+        output (binary file): The file the sorted values are written to as `array` items of the typecode.
+        memory_budget (int): The approximate number of bytes to use for sorting a run and for the merge buffers.
+        typecode (str): The `array` typecode of the values, "q" for 64-bit integers.
+        temp_dir (str | None): The directory of the temporary run files, defaults to the system temporary directory.
+        fan_in (int): The maximum number of runs merged at a time.
+        progress (callable | None): Called with the phase, "runs" or "merge", and the number of bytes written so far
+            in that phase.
+
+    Returns:
+        ExternalSortStats: The number of values, runs and merge passes, and the bytes, seconds and bytes per second of
+            every phase.
 
     Raises:
-        AttributeError: If the argument is not a list or empty
+        AttributeError: If the arguments are invalid or a value doesn't fit the typecode.
     """
 
     # Check arguments
-    if not isinstance(array, list):
-        raise AttributeError("The input list must be an actual list.")
-    if len(array) == 0:
-        raise AttributeError("The input list can't be empty.")
+    if isinstance(source, (str, bytes)) or not (hasattr(source, "read") or hasattr(source, "__iter__")):
+        raise AttributeError("The source must be an iterable of integers or a binary file.")
+    if not hasattr(output, "write"):
+        raise AttributeError("The output must be a writable binary file.")
+    if not isinstance(typecode, str) or typecode not in INTEGER_TYPECODES:
+        raise AttributeError("The typecode must be an integer array typecode.")
+    if not isinstance(fan_in, int) or fan_in < 2:
+        raise AttributeError("The fan in must be an integer of at least 2.")
+    itemsize = typed_array(typecode).itemsize
+    if not isinstance(memory_budget, int) or memory_budget < (fan_in + 1) * itemsize:
+        raise AttributeError("The memory budget must be an integer large enough for a buffer per merged run.")
+
+    run_size = max(memory_budget // RUN_BYTES_PER_VALUE, 1)
+    buffer_size = memory_budget // ((fan_in + 1) * itemsize)
+    phases = {phase: {"bytes": 0, "seconds": 0.0} for phase in ("runs", "merge")}
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        # Sort the runs and spill them to files
+        start_time = perf_counter_ns()
+        if hasattr(source, "read"):
+            chunks = (chunk.tolist() for chunk in read_typed_chunks(source, typecode, run_size))
+        else:
+            iterator = iter(source)
+            chunks = iter(lambda: list(islice(iterator, run_size)), [])
+        paths = []
+        n_values = 0
+        for chunk in chunks:
+            mergesort_bottom_up(chunk, 0, len(chunk) - 1)
+            try:
+                run = typed_array(typecode, chunk)
+            except (OverflowError, TypeError):
+                raise AttributeError(f"The values must be integers that fit the typecode {typecode}.") from None
+            paths.append(os.path.join(directory, f"run_{len(paths)}.bin"))
+            with open(paths[-1], "wb") as file:
+                run.tofile(file)
+            n_values += len(run)
+            phases["runs"]["bytes"] += len(run) * itemsize
+            if progress:
+                progress("runs", phases["runs"]["bytes"])
+        phases["runs"]["seconds"] = (perf_counter_ns() - start_time) / 1e9
+        n_runs = len(paths)
+
+        # Merge the runs fan_in at a time, the last pass writes to the output
+        start_time = perf_counter_ns()
+        n_passes = 0
+        while True:
+            n_passes += 1
+            if len(paths) <= fan_in:
+                phases["merge"]["bytes"] += merge_run_files(paths, output, typecode, buffer_size, progress=progress,
+                                                            done=phases["merge"]["bytes"])
+                break
+            merged_paths = []
+            for i in range(0, len(paths), fan_in):
+                merged_paths.append(os.path.join(directory, f"pass_{n_passes}_{len(merged_paths)}.bin"))
+                with open(merged_paths[-1], "wb") as file:
+                    phases["merge"]["bytes"] += merge_run_files(paths[i:i + fan_in], file, typecode, buffer_size,
+                                                                progress=progress, done=phases["merge"]["bytes"])
+            paths = merged_paths
+        phases["merge"]["seconds"] = (perf_counter_ns() - start_time) / 1e9
+
+    for phase in phases.values():
+        phase["bytes_per_s"] = phase["bytes"] / phase["seconds"] if phase["seconds"] > 0 else 0.0
+
+    return ExternalSortStats(n_values=n_values, n_runs=n_runs, n_merge_passes=n_passes, phases=phases)
+
+
+def digits_to_int(digits: str) -> int:
+    """Converts a string of decimal digits of any length to an integer.
+
+    The string is split in halves until each half is short enough for `int`, and the halves are recombined with
+    high * 10^len(low) + low. This avoids the 4300 digit limit of `int(str)` for very long numbers.
+
+    Args:
+        digits (str): The decimal digits.
+
+    Returns:
+        int: The integer value of the digits, 0 for an empty string.
+    """
+    if len(digits) == 0:
+        return 0
+    if len(digits) <= MAX_STR_DIGITS:
+        return int(digits)
+    mid = len(digits) // 2
+    return digits_to_int(digits[:mid]) * 10 ** (len(digits) - mid) + digits_to_int(digits[mid:])
+
+
+def mergesort_digit_strings(array: list, sort=mergesort) -> Tuple[str, str]:
+    """Builds the digit strings of the two maximum numbers by sorting the array with `mergesort`.
+
+    This is the O(n log n) reference engine of `rearrange_digits`, which sorts the array in place.
+
+    Args:
+       array (list of int): Input List of digits
+       sort (callable): The in place sort with the `mergesort` signature
+
+    Returns:
+       (str),(str): The digits of the two numbers
+    """
 
     # First sort the array, this is O(n log n) time complexity
     right = len(array) - 1
-    mergesort(array=array, left=0, right=right)
+    sort(array=array, left=0, right=right)
 
     # Build the two numbers from the sorted list, this is O(n) time complexity
     number_str_1 = ""
@@ -103,7 +474,260 @@ def rearrange_digits(array: list) -> Tuple[int, int]:
     if i == 0:
         number_str_1 += str(array[i])
 
-    return int(number_str_1), int(number_str_2)
+    return number_str_1, number_str_2
+
+
+def count_digits(digits) -> list:
+    """Counts every digit in a single pass.
+
+    Args:
+       digits (iterable of int): The digits to count
+
+    Returns:
+       list: The count of every digit 0 through 9
+
+    Raises:
+        AttributeError: If any element is not a digit in [0, 9]
+    """
+    try:
+        counter = Counter(digits)
+    except TypeError:
+        raise AttributeError("All elements must be digits in [0, 9].") from None
+    counts = [counter.pop(digit, 0) for digit in range(10)]
+    if len(counter) > 0:
+        raise AttributeError("All elements must be digits in [0, 9].")
+    return counts
+
+
+def split_digit_counts(counts: list) -> Tuple[list, list]:
+    """Splits the digit counts between the two maximum numbers.
+
+    In descending order, the digits alternate between the first and second number, starting with the first. For every
+    digit, one number gets half of its count rounded up and the other half rounded down, and an odd count swaps which
+    number gets the next digit first.
+
+    Args:
+       counts (list): The count of every digit 0 through 9
+
+    Returns:
+       (list),(list): The digit counts of the first and second number
+    """
+    counts_1 = [0] * 10
+    counts_2 = [0] * 10
+    first = True
+    for digit in range(9, -1, -1):
+        half = counts[digit] // 2
+        counts_1[digit] = counts[digit] - half if first else half
+        counts_2[digit] = counts[digit] - counts_1[digit]
+        if counts[digit] % 2 == 1:
+            first = not first
+    return counts_1, counts_2
+
+
+def counting_digit_strings(array: list) -> Tuple[str, str]:
+    """Builds the digit strings of the two maximum numbers from a digit histogram.
+
+    This is the O(n) engine of `rearrange_digits`. It counts the digits in one pass and then builds each number with a
+    single join of at most ten runs of repeated digits, so nothing is allocated per element and the array isn't changed.
+
+    Args:
+       array (list of int): Input List of digits
+
+    Returns:
+       (str),(str): The digits of the two numbers
+
+    Raises:
+        AttributeError: If any element is not a digit in [0, 9]
+    """
+    counts_1, counts_2 = split_digit_counts(count_digits(array))
+    return tuple("".join(DIGITS[digit] * counts[digit] for digit in range(9, -1, -1))
+                 for counts in (counts_1, counts_2))
+
+
+# The selectable rearrange engines, all return the digit strings of the two numbers
+REARRANGE_ENGINES = {
+    "counting": counting_digit_strings,
+    "mergesort": mergesort_digit_strings,
+    "bottom_up": partial(mergesort_digit_strings, sort=mergesort_bottom_up),
+}
+
+
+def rearrange_digits(array: list, engine: str = "counting") -> Tuple[int, int]:
+    """Rearrange Array Elements to form two number such that their sum is maximum.
+
+    The default counting engine has O(n) time complexity, the sorting engines O(nlog n).
+
+    Example:
+        Given: [1, 2, 3, 4, 5]
+        Result: [531, 42] or [542, 31]
+        Max Sum: 573 for both so either may be returned
+
+    Assumptions:
+        1. All array elements are in the range [0, 9]
+
+    Args:
+       array (list of int): Input List
+       engine (str): The rearrange engine, "counting" or one of the sorting engines "mergesort" (the reference) and
+           "bottom_up", which sort the array in place
+
+    Returns:
+       (int),(int): Two maximum sums
+
+    Raises:
+        AttributeError: If the argument is not a list or empty or the engine is unknown
+    """
+
+    # Check arguments
+    if not isinstance(array, list):
+        raise AttributeError("The input list must be an actual list.")
+    if len(array) == 0:
+        raise AttributeError("The input list can't be empty.")
+    if engine not in REARRANGE_ENGINES:
+        raise AttributeError(f"The engine must be one of {', '.join(REARRANGE_ENGINES)}.")
+
+    number_str_1, number_str_2 = REARRANGE_ENGINES[engine](array)
+
+    return digits_to_int(number_str_1), digits_to_int(number_str_2)
+
+
+def count_digit_stream(source, chunk_size: int = 1 << 16) -> list:
+    """Counts the digits of a stream chunk by chunk, so only one chunk is in memory at a time.
+
+    Args:
+       source (iterable of int | binary file): The digits as integers, or a binary file of ASCII digits in which
+           whitespace such as line breaks is ignored
+       chunk_size (int): The number of digits or bytes read at a time
+
+    Returns:
+       list: The count of every digit 0 through 9
+
+    Raises:
+        AttributeError: If the source contains anything other than digits (and whitespace for files)
+    """
+    counts = [0] * 10
+    if hasattr(source, "read"):
+        while chunk := source.read(chunk_size):
+            counter = Counter(chunk)
+            for digit, byte in enumerate(DIGITS.encode()):
+                counts[digit] += counter.pop(byte, 0)
+            if any(byte not in b" \t\r\n" for byte in counter):
+                raise AttributeError("The stream must only contain ASCII digits and whitespace.")
+    else:
+        iterator = iter(source)
+        while chunk := list(islice(iterator, chunk_size)):
+            counts = [total + count for total, count in zip(counts, count_digits(chunk))]
+    return counts
+
+
+def write_digit_runs(output, counts: list, chunk_size: int = 1 << 16):
+    """Writes the digits of the given counts in descending order as decimal text, one chunk at a time.
+
+    Leading zeros are dropped, so no digits or only zeros are written as a single "0".
+
+    Args:
+       output (text file): The text stream to write to
+       counts (list): The count of every digit 0 through 9
+       chunk_size (int): The maximum number of characters written at a time
+    """
+    if sum(counts[1:]) == 0:
+        output.write("0")
+        return
+    for digit in range(9, -1, -1):
+        remaining = counts[digit]
+        while remaining > 0:
+            size = min(remaining, chunk_size)
+            output.write(DIGITS[digit] * size)
+            remaining -= size
+
+
+def rearrange_digits_stream(source, output_1, output_2, chunk_size: int = 1 << 16) -> Tuple[int, int]:
+    """Rearrange a stream of digits to form two numbers such that their sum is maximum, see `rearrange_digits`.
+
+    The digits are consumed in chunks and only their counts are kept, then the two numbers are written incrementally
+    as decimal text. The peak memory is therefore O(chunk_size), independent of the length of the stream, and the time
+    complexity is O(n).
+
+    Args:
+       source (iterable of int | binary file): The digits as integers, or a binary file of ASCII digits in which
+           whitespace such as line breaks is ignored
+       output_1 (text file): The text stream the first number is written to
+       output_2 (text file): The text stream the second number is written to, "0" if there is only one digit
+       chunk_size (int): The number of digits or bytes read and the maximum number of characters written at a time
+
+    Returns:
+       (int),(int): The number of source digits used by the two numbers, including zeros that aren't written
+
+    Raises:
+        AttributeError: If the arguments are invalid or the source is empty or contains anything but digits
+    """
+
+    # Check arguments
+    if isinstance(source, (str, bytes)) or not (hasattr(source, "read") or hasattr(source, "__iter__")):
+        raise AttributeError("The source must be an iterable of digits or a binary file.")
+    if not hasattr(output_1, "write") or not hasattr(output_2, "write"):
+        raise AttributeError("The outputs must be writable text streams.")
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise AttributeError("The chunk size must be a positive integer.")
+
+    counts = count_digit_stream(source, chunk_size=chunk_size)
+    if sum(counts) == 0:
+        raise AttributeError("The source can't be empty.")
+
+    counts_1, counts_2 = split_digit_counts(counts)
+    write_digit_runs(output_1, counts_1, chunk_size=chunk_size)
+    write_digit_runs(output_2, counts_2, chunk_size=chunk_size)
+
+    return sum(counts_1), sum(counts_2)
+
+
+class CountingWriter:
+    """A text stream that only counts the writes and the largest write, used to benchmark streaming outputs."""
+
+    def __init__(self):
+        self.writes = 0
+        self.largest = 0
+
+    def write(self, text: str):
+        self.writes += 1
+        self.largest = max(self.largest, len(text))
+
+
+class KeyedValue:
+    """A value compared only by its key, used to check that sorts are stable."""
+
+    def __init__(self, key: int, tag: int):
+        self.key = key
+        self.tag = tag
+
+    def __lt__(self, other) -> bool:
+        return self.key < other.key
+
+    def __gt__(self, other) -> bool:
+        return self.key > other.key
+
+    def __le__(self, other) -> bool:
+        return self.key <= other.key
+
+
+def random_digits(n_digits: int) -> list:
+    """Returns a list of random digits in [0, 9]."""
+    return random.choices(range(10), k=n_digits)
+
+
+def benchmark_cases() -> list:
+    """The scaling benchmark cases of this problem, see `benchmark.scaling`.
+
+    Returns:
+        list: The keyword arguments of every scaling benchmark.
+    """
+    sizes = [10 ** e for e in range(4, 7)]
+    return [
+        dict(name="problem_3.counting_digit_strings", func=counting_digit_strings, setup=lambda n: (random_digits(n),),
+             sizes=sizes, expected="O(n)", warmup=0, repeat=3),
+        dict(name="problem_3.mergesort_digit_strings", func=mergesort_digit_strings,
+             setup=lambda n: (random_digits(n),), sizes=sizes, expected="O(n log n)", warmup=0, repeat=3,
+             fresh_input=True),
+    ]
 
 
 def test_function(test_case):
@@ -143,6 +767,19 @@ def user_tests():
             print(f"Error test {test}: expected {expected}, but got {array}.")
             n_errors += 1
 
+    # Test the bottom-up merge sort on whole arrays and sub arrays, including stability
+    for n in [0, 1, 2, 31, 32, 33, 64, 65, 100, 1000, 4099]:
+        for left, right in [(0, n - 1), (n // 3, n - 1 - n // 4)]:
+            test += 1
+            keys = [KeyedValue(random.randint(0, 20), i) for i in range(n)]
+            expected = keys[:left] + sorted(keys[left:right + 1], key=lambda x: x.key) + keys[right + 1:]
+            mergesort_bottom_up(array=keys, left=left, right=right)
+            if [(x.key, x.tag) for x in keys] == [(x.key, x.tag) for x in expected]:
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: the bottom-up merge sort of n = {n} in [{left}, {right}] failed.")
+                n_errors += 1
+
     # Test set 2 - Invalid arguments
     print("\nUser test set 2 - Invalid arguments.")
     test = 0
@@ -158,27 +795,167 @@ def user_tests():
             n_errors += 1
 
     # User Test Case 3 - Scaling test of rearrange_digits
-    print("\nUser test set 3 - rearrange_digits O(nlog n) runtime complexity check.")
-    times = []
-    e_values = [4 + i for i in range(3)]
-    test = 0
-    for e in e_values:
-        test += 1
-        array = [random.randint(0, 9) for _ in range(10 ** e)]
-        start_time = time()
-        rearrange_digits(array=array)
-        times.append(time() - start_time)
-        print(f"\tTest {test} completed in {times[-1]:.2f} seconds for n = 10^{e}.")
-        del array
-
-    print("\tSize, time (s),    n,  nlog n, actual scaled time ")
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        print(f"\t10^{e_values[i]},    {times[i]:.3f}, {n:>4},   {n*log2(n):>5.1f}, {times[i]/times[0]:>6.1f}")
-    print("You can see the scaled time is rising > n, but below n log n.")
-    print("This agrees with a time complexity of O(n log n).")
+    print("\nUser test set 3 - rearrange_digits O(n) and O(nlog n) runtime complexity check of the two engines.")
+    for case in benchmark_cases():
+        print_scaling(scaling(**case))
+    print("You can see the scaled time of the mergesort engine is rising > n, but below n log n.")
+    print("This agrees with a time complexity of O(n) for the counting and O(n log n) for the mergesort engine.")
     print("Note we are using a random set of values so the run time is less than the worse case.")
 
+    # User Test Case 4 - Engines agree
+    print("\nUser test set 4 - The counting and mergesort engines agree.")
+    for digits in [[0], [7], [0, 0], [9, 1], [1, 1, 1], [0, 0, 5], [5, 5, 0, 0]] + [random_digits(random.randint(1, 60))
+                                                                                  for _ in range(50)]:
+        test += 1
+        actual = [rearrange_digits(array=list(digits), engine=engine) for engine in REARRANGE_ENGINES]
+        expected = sorted(digits, reverse=True)
+        expected = (int("".join(map(str, expected[0::2]))), int("".join(map(str, expected[1::2])) or "0"))
+        if actual != [expected] * len(REARRANGE_ENGINES):
+            print(f"Error test {test}: {digits} expected {expected}, but got {actual}.")
+            n_errors += 1
+    print(f"Tests through {test} completed.")
+
+    for arg in [[1, 10], [-1], [1, "2"], [[1]], [1, {}]]:
+        test += 1
+        try:
+            rearrange_digits(array=arg)
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    # User Test Case 5 - Engine benchmark
+    print("\nUser test set 5 - Counting versus mergesort engine, including the conversion to integers.")
+    print("\t    Size | counting (s) | mergesort (s) | speedup")
+    for e in range(4, 7):
+        digits = random_digits(10 ** e)
+        times = [measure(rearrange_digits, setup=lambda: (list(digits), engine), warmup=0, repeat=3)["median_ns"] / 1e9
+                 for engine in ("counting", "mergesort")]
+        print(f"\t{10 ** e:>8.0e} | {times[0]:>12.3f} | {times[1]:>13.3f} | {times[1] / times[0]:>7.1f}")
+
+    # User Test Case 6 - Sort benchmark
+    print("\nUser test set 6 - Recursive versus bottom-up merge sort of random integers.")
+    print("\t    Size | recursive (s) | bottom-up (s) | speedup")
+    for e in range(4, 7):
+        values = [random.randrange(10 ** 9) for _ in range(10 ** e)]
+        times = [measure(sort, setup=lambda: (list(values), 0, len(values) - 1), warmup=0, repeat=3)["median_ns"] / 1e9
+                 for sort in (mergesort, mergesort_bottom_up)]
+        print(f"\t{10 ** e:>8.0e} | {times[0]:>13.3f} | {times[1]:>13.3f} | {times[0] / times[1]:>7.1f}")
+
+    # User Test Case 7 - Parallel merge sort
+    print("\nUser test set 7 - Parallel merge sort through shared memory and a k-way merge.")
+    for values, workers in [([random.randrange(-10 ** 12, 10 ** 12) for _ in range(5000)], 3),
+                            ([random.random() for _ in range(5000)], 2), ([2 ** 70, 1, 2 ** 65, 0, 5] * 100, 4)]:
+        test += 1
+        array = [7, 7] + values + [7]
+        expected = [7, 7] + sorted(values) + [7]
+        mergesort_parallel(array=array, left=2, right=len(values) + 1, max_workers=workers, min_parallel_size=0)
+        if array == expected:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: the parallel merge sort failed.")
+            n_errors += 1
+
+    n_workers = max(os.cpu_count() or 1, 2)
+    print(f"\t    Size | serial (s) | parallel (s) | speedup, with {n_workers} workers on {os.cpu_count()} CPUs")
+    crossover = None
+    for e in range(4, 7):
+        values = [random.randrange(10 ** 9) for _ in range(10 ** e)]
+        sorts = (mergesort_bottom_up, partial(mergesort_parallel, max_workers=n_workers, min_parallel_size=0))
+        serial, parallel = [measure(sort, setup=lambda: (list(values), 0, len(values) - 1), warmup=0,
+                                    repeat=3)["median_ns"] / 1e9 for sort in sorts]
+        print(f"\t{10 ** e:>8.0e} | {serial:>10.3f} | {parallel:>12.3f} | {serial / parallel:>7.1f}")
+        if crossover is None and parallel < serial:
+            crossover = 10 ** e
+    print(f"\tThe parallel sort is faster from n = {crossover:.0e}." if crossover else
+          "\tThe parallel sort was not faster for any size on this machine.")
+
+    # User Test Case 8 - Streaming digits
+    print("\nUser test set 8 - Streaming digits from iterators and binary files.")
+    for digits in [[5], [0], [0, 0], [0, 0, 0], [0, 0, 0, 0, 1], [1, 2, 3, 4, 5], random_digits(1000)]:
+        expected = rearrange_digits(array=list(digits))
+        for source in [iter(digits), (d for d in digits), io.BytesIO("".join(map(str, digits)).encode() + b"\n")]:
+            test += 1
+            output_1 = io.StringIO()
+            output_2 = io.StringIO()
+            lengths = rearrange_digits_stream(source, output_1, output_2, chunk_size=7)
+            # Compare the text, since digits_to_int would accept leading zeros
+            actual = (output_1.getvalue(), output_2.getvalue())
+            if actual == tuple(map(str, expected)) and lengths == (len(digits) - len(digits) // 2, len(digits) // 2):
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: expected {expected}, but got {actual}.")
+                n_errors += 1
+
+    for source in [iter([]), io.BytesIO(b"12a"), iter([1, 12]), "123", None]:
+        test += 1
+        try:
+            rearrange_digits_stream(source, io.StringIO(), io.StringIO())
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    print("\t    Size | time (s) | writes | largest write")
+    for e in range(5, 8):
+        source = (i % 10 for i in range(10 ** e))
+        output_1 = CountingWriter()
+        output_2 = CountingWriter()
+        runtime = measure(rearrange_digits_stream, setup=lambda: (source, output_1, output_2), warmup=0,
+                          repeat=1)["median_ns"] / 1e9
+        print(f"\t{10 ** e:>8.0e} | {runtime:>8.3f} | {output_1.writes + output_2.writes:>6} | "
+              f"{max(output_1.largest, output_2.largest):>13}")
+    print("The digits are never held in memory, only one chunk at a time is.")
+
+    # User Test Case 9 - External merge sort
+    print("\nUser test set 9 - External merge sort through temporary run files.")
+    for values, typecode, fan_in in [([], "q", 2), ([5], "q", 2),
+                                     ([random.randrange(-10 ** 15, 10 ** 15) for _ in range(1000)], "q", 3),
+                                     ([random.randrange(100) for _ in range(777)], "H", 2),
+                                     ([random.randrange(10) for _ in range(500)], "b", 16)]:
+        for from_file in [False, True]:
+            test += 1
+            source = io.BytesIO(typed_array(typecode, values).tobytes()) if from_file else iter(values)
+            output = io.BytesIO()
+            written = []
+            stats = external_sort(source, output, memory_budget=480, typecode=typecode, fan_in=fan_in,
+                                  progress=lambda phase, n_bytes: written.append((phase, n_bytes)))
+            actual = typed_array(typecode, output.getvalue()).tolist()
+            n_bytes = len(values) * typed_array(typecode).itemsize
+            if (actual == sorted(values) and stats.n_values == len(values) and
+                    stats.phases["runs"]["bytes"] == stats.phases["merge"]["bytes"] // stats.n_merge_passes == n_bytes
+                    and written == sorted(written, key=lambda x: (x[0] == "merge", x[1]))):
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: the external sort of {len(values)} values failed.")
+                n_errors += 1
+
+    for kwargs in [dict(source="123"), dict(source=None), dict(output=None), dict(fan_in=1), dict(memory_budget=8),
+                   dict(typecode="d"), dict(typecode=""), dict(typecode="qQ"), dict(typecode=None),
+                   dict(source=[1, 2 ** 70]), dict(source=[1.5]), dict(source=io.BytesIO(b"123"))]:
+        test += 1
+        try:
+            external_sort(**{"source": [3, 1, 2], "output": io.BytesIO(), **kwargs})
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    print("\t    Size | runs | passes | runs (MB/s) | merge (MB/s) | total (s)")
+    with tempfile.TemporaryDirectory() as directory:
+        for e in range(4, 7):
+            values = [random.randrange(-2 ** 63, 2 ** 63) for _ in range(10 ** e)]
+            with open(os.path.join(directory, "sorted.bin"), "wb") as output:
+                stats = external_sort(values, output, memory_budget=1 << 20, temp_dir=directory, fan_in=8)
+            phases = stats.phases
+            print(f"\t{10 ** e:>8.0e} | {stats.n_runs:>4} | {stats.n_merge_passes:>6} | "
+                  f"{phases['runs']['bytes_per_s'] / 1e6:>11.1f} | {phases['merge']['bytes_per_s'] / 1e6:>12.1f} | "
+                  f"{phases['runs']['seconds'] + phases['merge']['seconds']:>9.3f}")
+    print("Only one run, or one buffer per merged run, is in memory at a time, the rest is in the temporary files.")
+
     print("\n*******************")
     if n_errors > 0:
         raise RuntimeError(f"BOO HOO, {n_errors} errors detected.\n")
@@ -1,28 +1,138 @@
 #!/usr/bin/env python3
 
+from array import array as typed_array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, repeat
+from multiprocessing.shared_memory import SharedMemory
+import os
 import random
-from time import time
+from time import perf_counter_ns
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from benchmark import measure, print_scaling, scaling
+
+# Byte buffers are counted in chunks of this size, which bounds the temporary memory of the vectorized counting
+COUNT_CHUNK_SIZE = 1 << 20
+
+
+def check_byte_buffer(values):
+    """Checks that the values are a writable, one-dimensional buffer of single bytes.
+
+    Args:
+       values (bytearray | memoryview | numpy.ndarray): The buffer to check
+
+    Returns:
+        bool: True if the values are a byte buffer, False if they are not a buffer type at all
+
+    Raises:
+        AttributeError: If the values are a buffer type but not a writable, one-dimensional buffer of single bytes
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        if values.dtype not in (np.int8, np.uint8) or values.ndim != 1:
+            raise AttributeError("A NumPy input must be a one-dimensional int8 or uint8 array.")
+        if not values.flags.writeable:
+            raise AttributeError("A NumPy input must be writable.")
+        return True
+    if isinstance(values, memoryview):
+        if values.itemsize != 1 or values.ndim != 1 or not values.c_contiguous:
+            raise AttributeError("A memoryview input must be a contiguous, one-dimensional view of single bytes.")
+        if values.readonly:
+            raise AttributeError("A memoryview input must be writable.")
+        return True
+    return isinstance(values, bytearray)
+
+
+def count_012(values) -> list:
+    """Counts the 0, 1 and 2 values of a byte buffer with vectorized passes over chunks of `COUNT_CHUNK_SIZE`.
+
+    NumPy is used to count the chunks if it is installed, otherwise the chunks are counted with `bytes.count`.
+
+    Args:
+       values (bytearray | memoryview | numpy.ndarray): A buffer of single bytes, see `check_byte_buffer`
+
+    Returns:
+        list: The number of 0, 1 and 2 values
+
+    Raises:
+        AttributeError: If the buffer contains any other value
+    """
+    counts = [0, 0, 0]
+    if np is not None:
+        data = values.view(np.uint8) if isinstance(values, np.ndarray) else np.frombuffer(values, dtype=np.uint8)
+        for start in range(0, len(data), COUNT_CHUNK_SIZE):
+            chunk = data[start:start + COUNT_CHUNK_SIZE]
+            chunk_counts = [int(np.count_nonzero(chunk == value)) for value in range(3)]
+            if sum(chunk_counts) != len(chunk):
+                raise AttributeError("The input can only contain 0, 1 and 2.")
+            counts = [total + count for total, count in zip(counts, chunk_counts)]
+    else:
+        view = memoryview(values).cast("B")
+        for start in range(0, len(view), COUNT_CHUNK_SIZE):
+            chunk = view[start:start + COUNT_CHUNK_SIZE].tobytes()
+            chunk_counts = [chunk.count(value) for value in range(3)]
+            if sum(chunk_counts) != len(chunk):
+                raise AttributeError("The input can only contain 0, 1 and 2.")
+            counts = [total + count for total, count in zip(counts, chunk_counts)]
+    return counts
+
+
+def fill_012(values, counts: list):
+    """Overwrites a byte buffer with the counted 0, 1 and 2 values in order, using one slice assignment per value.
+
+    Args:
+       values (bytearray | memoryview | numpy.ndarray): A buffer of single bytes, see `check_byte_buffer`
+       counts (list): The number of 0, 1 and 2 values, which must add up to the length of the buffer
+    """
+    if np is None:
+        data = memoryview(values).cast("B")
+    elif isinstance(values, np.ndarray):
+        data = values
+    else:
+        data = np.frombuffer(values, dtype=np.uint8)
+    start = 0
+    for value, count in enumerate(counts):
+        if np is not None:
+            data[start:start + count] = value
+        else:
+            data[start:start + count] = bytes([value]) * count
+        start += count
 
 
 def sort_012(input_list: list) -> list:
     """Given an input array consisting on only 0, 1, and 2, sort the array in a single traversal.
 
+    Byte buffers, i.e. a `bytearray`, a `memoryview` of single bytes or a NumPy int8 or uint8 array, aren't swapped
+    element by element. Their values are counted with `count_012` and the buffer is overwritten in place with
+    `fill_012`.
+
     Args:
-       input_list (list): List to be sorted
+       input_list (list | bytearray | memoryview | numpy.ndarray): List to be sorted
 
     Returns:
-        list: The sorted version of the input list
+        list | bytearray | memoryview | numpy.ndarray: The input list, sorted in place
 
     Raises:
-        AttributeError: If the argument is not a list or an empty list
+        AttributeError: If the argument is not a list or byte buffer, or is empty
+        AttributeError: If a byte buffer contains anything other than 0, 1 and 2
     """
 
     # Check arguments
-    if not isinstance(input_list, list):
-        raise AttributeError("The input list must be an actual list.")
+    is_buffer = check_byte_buffer(input_list)
+    if not isinstance(input_list, list) and not is_buffer:
+        raise AttributeError("The input list must be an actual list, a bytearray, a memoryview or a NumPy array.")
     if len(input_list) == 0:
         raise AttributeError("The input list can't be empty.")
 
+    if is_buffer:
+        fill_012(input_list, count_012(input_list))
+        return input_list
+
     i = 0
     left = 0
     right = len(input_list) - 1
@@ -33,7 +143,7 @@ def sort_012(input_list: list) -> list:
             input_list[i] = input_list[left]
             input_list[left] = v
             left += 1
-            i = max(i, left)
+            i += 1
         elif v == 2:
             input_list[i] = input_list[right]
             input_list[right] = v
@@ -44,6 +154,292 @@ def sort_012(input_list: list) -> list:
     return input_list
 
 
+def _count_shared_chunk(name: str, start: int, stop: int) -> list | None:
+    """Counts the 0, 1 and 2 values of the bytes [start, stop) of a shared memory block in a worker process.
+
+    Returns None for invalid values instead of raising, since the traceback would keep the block's buffer exported.
+    """
+    shared = SharedMemory(name=name)
+    view = shared.buf[start:stop]
+    try:
+        counts = count_012(view)
+    except AttributeError:
+        counts = None
+    view.release()
+    shared.close()
+    return counts
+
+
+def _fill_shared_chunk(name: str, start: int, stop: int, counts: list):
+    """Fills the bytes [start, stop) of a shared memory block with its share of the 0, 1 and 2 values."""
+    shared = SharedMemory(name=name)
+    try:
+        view = shared.buf[start:stop]
+        fill_012(view, counts)
+        view.release()
+    finally:
+        shared.close()
+
+
+def sort_012_parallel(input_list, max_workers: int | None = None, timings: dict | None = None,
+                      min_parallel_size: int = 1 << 22):
+    """Sorts a byte buffer of 0, 1 and 2 values with `count_012` and `fill_012` split over worker processes.
+
+    The buffer is split into one chunk per worker and the workers count their chunks in parallel. The prefix sums of
+    the total counts give the region of every value, and every worker then fills its own chunk with its overlap of the
+    three regions, again in parallel. A `SharedMemory` block is sorted in place; any other byte buffer is copied into
+    one and back, which are two fast serial copies. Non-contiguous NumPy arrays are sorted serially.
+
+    Args:
+       input_list (bytearray | memoryview | numpy.ndarray | SharedMemory): The byte buffer to sort, see
+           `check_byte_buffer`, or a shared memory block of which every byte is sorted
+       max_workers (int | None): The number of worker processes, defaults to the number of CPUs
+       timings (dict | None): If given, the seconds of the "copy", "count" and "fill" phases are stored in it
+       min_parallel_size (int): Smaller buffers are sorted with `sort_012`, since starting processes costs more than
+           it saves
+
+    Returns:
+        bytearray | memoryview | numpy.ndarray | SharedMemory: The input list, sorted in place
+
+    Raises:
+        AttributeError: If the argument isn't a non-empty byte buffer or contains anything other than 0, 1 and 2
+    """
+
+    # Check arguments
+    if not isinstance(input_list, SharedMemory) and not check_byte_buffer(input_list):
+        raise AttributeError("The input list must be a bytearray, a memoryview, a NumPy array or a SharedMemory.")
+    n_values = input_list.size if isinstance(input_list, SharedMemory) else len(input_list)
+    if n_values == 0:
+        raise AttributeError("The input list can't be empty.")
+    if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+        raise AttributeError("The number of workers must be a positive integer.")
+
+    timings = {} if timings is None else timings
+    timings.update(copy=0.0, count=0.0, fill=0.0)
+    n_workers = max_workers or os.cpu_count() or 1
+    if isinstance(input_list, SharedMemory):
+        shared = input_list
+    else:
+        if n_values < min_parallel_size or n_workers == 1 or not memoryview(input_list).c_contiguous:
+            start_time = perf_counter_ns()
+            fill_012(input_list, count_012(input_list))
+            timings["fill"] = (perf_counter_ns() - start_time) / 1e9
+            return input_list
+        start_time = perf_counter_ns()
+        shared = SharedMemory(create=True, size=n_values)
+        shared.buf[:n_values] = memoryview(input_list).cast("B")
+        timings["copy"] = (perf_counter_ns() - start_time) / 1e9
+
+    try:
+        bounds = [n_values * i // n_workers for i in range(n_workers + 1)]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            start_time = perf_counter_ns()
+            chunk_counts = list(executor.map(_count_shared_chunk, [shared.name] * n_workers, bounds[:-1], bounds[1:]))
+            if None in chunk_counts:
+                raise AttributeError("The input can only contain 0, 1 and 2.")
+            counts = [sum(column) for column in zip(*chunk_counts)]
+            timings["count"] = (perf_counter_ns() - start_time) / 1e9
+
+            # The value v fills [ends[v - 1], ends[v]), and every chunk gets its overlap with each of these regions
+            start_time = perf_counter_ns()
+            ends = [counts[0], counts[0] + counts[1], n_values]
+            fill_counts = [[max(min(stop, end) - max(start, begin), 0) for begin, end in zip([0] + ends, ends)]
+                           for start, stop in zip(bounds, bounds[1:])]
+            list(executor.map(_fill_shared_chunk, [shared.name] * n_workers, bounds[:-1], bounds[1:], fill_counts))
+            timings["fill"] = (perf_counter_ns() - start_time) / 1e9
+
+        if shared is not input_list:
+            start_time = perf_counter_ns()
+            memoryview(input_list).cast("B")[:] = shared.buf[:n_values]
+            timings["copy"] += (perf_counter_ns() - start_time) / 1e9
+    finally:
+        if shared is not input_list:
+            shared.close()
+            shared.unlink()
+
+    return input_list
+
+
+class Sort012:
+    """A streaming accumulator of 0, 1 and 2 values that can produce their sorted sequence at any time.
+
+    Only the count of every value is stored, so every update is O(1) memory however long the stream is, and the
+    sorted sequence is generated lazily from the counts. It is the same sequence `sort_012` returns for the values
+    added so far.
+    """
+
+    def __init__(self, values=None):
+        """The object instantiation method.
+
+        Args:
+            values (iterable | None): The initial values, see `extend`.
+        """
+        self._counts = [0, 0, 0]
+        if values is not None:
+            self.extend(values)
+
+    def add(self, value: int):
+        """Adds a single value.
+
+        Args:
+            value (int): The value, 0, 1 or 2.
+
+        Raises:
+            AttributeError: If the value isn't 0, 1 or 2.
+        """
+        if value not in (0, 1, 2):
+            raise AttributeError("The value must be 0, 1 or 2.")
+        self._counts[int(value)] += 1
+
+    def extend(self, values):
+        """Adds a chunk of values. Byte buffers are counted with the vectorized `count_012` and other one-dimensional
+        NumPy integer arrays with `numpy.count_nonzero`.
+
+        Args:
+            values (iterable | bytearray | memoryview | numpy.ndarray): The values, all 0, 1 or 2.
+
+        Raises:
+            AttributeError: If any value isn't 0, 1 or 2, in which case none of the values are added.
+        """
+        if np is not None and isinstance(values, np.ndarray) and values.ndim == 1 and \
+                np.issubdtype(values.dtype, np.integer) and values.dtype not in (np.int8, np.uint8):
+            counts = [int(np.count_nonzero(values == value)) for value in range(3)]
+            if sum(counts) != len(values):
+                raise AttributeError("The values must be 0, 1 or 2.")
+        elif isinstance(values, bytes) or check_byte_buffer(values):
+            counts = count_012(bytearray(values) if isinstance(values, bytes) else values)
+        elif not hasattr(values, "__iter__") or isinstance(values, str):
+            raise AttributeError("The values must be an iterable of 0, 1 and 2.")
+        else:
+            try:
+                counter = Counter(values)
+            except TypeError:
+                raise AttributeError("The values must be 0, 1 or 2.") from None
+            counts = [counter.pop(value, 0) for value in range(3)]
+            if counter:
+                raise AttributeError("The values must be 0, 1 or 2.")
+        self._counts = [total + count for total, count in zip(self._counts, counts)]
+
+    @property
+    def counts(self) -> tuple:
+        """tuple: The number of 0, 1 and 2 values added so far."""
+        return tuple(self._counts)
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def __iter__(self):
+        """Lazily yields the sorted values added so far."""
+        return chain.from_iterable(repeat(value, count) for value, count in enumerate(self._counts))
+
+    def runs(self) -> list:
+        """Returns the sorted values added so far as run-length triples.
+
+        Returns:
+            list: A (value, start, count) triple for every value that was added at least once.
+        """
+        triples = []
+        start = 0
+        for value, count in enumerate(self._counts):
+            if count > 0:
+                triples.append((value, start, count))
+            start += count
+        return triples
+
+    def clear(self):
+        """Removes all the values."""
+        self._counts = [0, 0, 0]
+
+
+def american_flag_partition(input_list, n_keys: int = 3, key=None):
+    """Partitions the input list in place by small integer keys, the generalization of `sort_012` to k keys.
+
+    This is the American flag sort: a first pass counts the keys, the prefix sums of the counts give the region of every
+    key, and a second pass moves every misplaced element straight to the next free slot of its region. The displaced
+    element is carried on to its own region in turn, a cycle leader permutation, until the cycle returns to the slot it
+    started from. Only the counts and the next free slot of every key are stored, so the extra memory is O(k) instead of
+    an O(n) output buffer. The partition isn't stable.
+
+    Args:
+       input_list (list | bytearray | array | numpy.ndarray): The mutable sequence to partition
+       n_keys (int): The number of keys k, the keys must be integers in [0, k)
+       key (callable | None): Returns the key of an element, defaults to the element itself
+
+    Returns:
+        list | bytearray | array | numpy.ndarray: The input list, partitioned in place by ascending key
+
+    Raises:
+        AttributeError: If the arguments are invalid or a key isn't an integer in [0, n_keys), in which case the input
+            list is left unchanged
+    """
+
+    # Check arguments
+    if not hasattr(input_list, "__setitem__") or isinstance(input_list, (str, bytes, tuple)):
+        raise AttributeError("The input list must be a mutable sequence.")
+    if not isinstance(n_keys, int) or n_keys < 1:
+        raise AttributeError("The number of keys must be a positive integer.")
+    if key is not None and not callable(key):
+        raise AttributeError("The key must be callable.")
+    key = key or (lambda value: value)
+
+    # Count the keys, which also validates all of them before anything is moved
+    counts = [0] * n_keys
+    try:
+        for value in input_list:
+            k = key(value)
+            if not 0 <= k < n_keys:
+                raise IndexError
+            counts[k] += 1
+    except (IndexError, TypeError):
+        raise AttributeError(f"The keys must be integers in [0, {n_keys}).") from None
+
+    # The region of key k is [next_free[k], ends[k])
+    next_free = [0] * n_keys
+    ends = [0] * n_keys
+    total = 0
+    for k, count in enumerate(counts):
+        next_free[k] = total
+        total += count
+        ends[k] = total
+
+    for bucket in range(n_keys):
+        while next_free[bucket] < ends[bucket]:
+            value = input_list[next_free[bucket]]
+            k = key(value)
+            while k != bucket:
+                # Place the value in its region and carry on with the one it displaces
+                slot = next_free[k]
+                next_free[k] = slot + 1
+                input_list[slot], value = value, input_list[slot]
+                k = key(value)
+            input_list[next_free[bucket]] = value
+            next_free[bucket] += 1
+
+    return input_list
+
+
+def random_bytes_012(n: int) -> bytearray:
+    """Returns a bytearray of n random 0, 1 and 2 values."""
+    block = bytearray(random.choices(b"\x00\x01\x02", k=min(n, 1 << 16)))
+    return (block * -(-n // len(block)))[:n]
+
+
+def benchmark_cases() -> list:
+    """The scaling benchmark cases of this problem, see `benchmark.scaling`.
+
+    Returns:
+        list: The keyword arguments of every scaling benchmark.
+    """
+    return [dict(name="problem_4.sort_012", func=sort_012,
+                 setup=lambda n: (random.choices((0, 1, 2), k=n),), sizes=[10 ** e for e in range(5, 8)],
+                 expected="O(n)", warmup=0, repeat=3, fresh_input=True),
+            dict(name="problem_4.sort_012.bytearray", func=sort_012, setup=lambda n: (random_bytes_012(n),),
+                 sizes=[10 ** e for e in range(6, 9)], expected="O(n)", warmup=0, repeat=3, fresh_input=True),
+            dict(name="problem_4.american_flag_partition", func=american_flag_partition,
+                 setup=lambda n: ([random.randrange(256) for _ in range(n)], 256), sizes=[10 ** e for e in range(4, 7)],
+                 expected="O(n)", warmup=0, repeat=3, fresh_input=True)]
+
+
 def test_function(test_case):
     actual = sort_012(test_case)
     expected = sorted(test_case)
@@ -95,26 +491,237 @@ def user_tests():
 
     # User Test Case 3 - Scaling test of sort
     print("\nUser test set 3 - sort O(n) runtime complexity check.")
-    times = []
-    e_values = [5 + i for i in range(3)]
-    test = 0
-    for e in e_values:
-        test += 1
-        array = [random.randint(0, 2) for _ in range(10 ** e)]
-        start_time = time()
-        sort_012(input_list=array)
-        times.append(time() - start_time)
-        print(f"\tTest {test} completed in {times[-1]:.2f} seconds for n = 10^{e}.")
-        del array
-
-    print("\tSize, time (s),    n,  actual scaled time ")
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        print(f"\t10^{e_values[i]},    {times[i]:.3f}, {n:>4}, {times[i]/times[0]:>6.1f}")
+    for case in benchmark_cases():
+        print_scaling(scaling(**case))
     print("You can see the scaled time is rising slightly below n.")
     print("This agrees with a time complexity of O(n).")
     print("Note we are using a random set of values so the run time is less than the worse case.")
 
+    # Test set 4 - Byte buffers
+    print("\nUser test set 4 - Sorting bytearrays, memoryviews and NumPy arrays in place.")
+    test = 0
+    for values in [[0], [2, 2], [1, 0], [2, 1, 0], random.choices((0, 1, 2), k=1000),
+                   random.choices((0, 1, 2), k=COUNT_CHUNK_SIZE + 17)]:
+        buffers = [bytearray(values), memoryview(bytearray(values)), memoryview(bytearray(values)).cast("b")]
+        if np is not None:
+            buffers += [np.array(values, dtype=np.int8), np.array(values, dtype=np.uint8)]
+        for buffer in buffers:
+            test += 1
+            actual = sort_012(input_list=buffer)
+            if actual is buffer and list(buffer) == sorted(values):
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: the {type(buffer).__name__} of {len(values)} values wasn't sorted in place.")
+                n_errors += 1
+
+    bad_inputs = [b"\x00\x01", bytearray(), bytearray([0, 3, 1]), memoryview(bytes([0, 1])),
+                  memoryview(bytearray(8)).cast("q"), bytearray([0] * COUNT_CHUNK_SIZE + [255])]
+    if np is not None:
+        bad_inputs += [np.array([0, 1], dtype=np.int16), np.array([0, -1], dtype=np.int8),
+                       np.zeros((2, 2), dtype=np.uint8), np.array([], dtype=np.uint8)]
+    for array in bad_inputs:
+        test += 1
+        try:
+            # noinspection PyTypeChecker
+            sort_012(input_list=array)
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    # Test set 5 - Swap loop versus counting benchmark
+    print("\nUser test set 5 - Swap loop on a list versus counting on a bytearray and a NumPy array.")
+    print("\t    Size | list (s) | bytearray (s) | numpy (s) | speedup")
+    for e in range(5, 8):
+        values = random_bytes_012(10 ** e)
+        setups = [lambda: (list(values),), lambda: (bytearray(values),)]
+        if np is not None:
+            setups.append(lambda: (np.frombuffer(values, dtype=np.uint8).copy(),))
+        times = [measure(sort_012, setup=setup, warmup=0, repeat=3)["median_ns"] / 1e9 for setup in setups]
+        numpy_time = f"{times[2]:>9.4f}" if np is not None else f"{'n/a':>9}"
+        speedup = times[0] / min(times)
+        print(f"\t{10 ** e:>8.0e} | {times[0]:>8.3f} | {times[1]:>13.4f} | {numpy_time} | {speedup:>7.0f}")
+
+    # Test set 6 - American flag partition
+    print("\nUser test set 6 - In place partition by k keys.")
+    test = 0
+    for n_keys in [1, 2, 3, 10, 256]:
+        for n in [0, 1, 2, 100, 5000]:
+            values = [random.randrange(n_keys) for _ in range(n)]
+            inputs = [list(values), bytearray(values), typed_array("H", values)]
+            if np is not None:
+                inputs.append(np.array(values, dtype=np.int32))
+            for input_list in inputs:
+                test += 1
+                actual = american_flag_partition(input_list=input_list, n_keys=n_keys)
+                if actual is input_list and list(actual) == sorted(values):
+                    print(f"Test {test} passed.")
+                else:
+                    print(f"Error test {test}: {type(input_list).__name__} of {n} values with {n_keys} keys failed.")
+                    n_errors += 1
+
+    for n_keys in [3, 7, 40]:
+        test += 1
+        records = [(random.randrange(n_keys), i) for i in range(3000)]
+        actual = american_flag_partition(input_list=list(records), n_keys=n_keys, key=lambda record: record[0])
+        if [r[0] for r in actual] == sorted(r[0] for r in records) and sorted(actual) == sorted(records):
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: the records weren't partitioned by key.")
+            n_errors += 1
+
+    for kwargs in [dict(input_list="210"), dict(input_list=(2, 1, 0)), dict(n_keys=0), dict(n_keys=2.5),
+                   dict(key=3), dict(input_list=[0, 3, 1]), dict(input_list=[0, -1, 1]), dict(input_list=[0, "1"]),
+                   dict(input_list=[0, 1.0])]:
+        test += 1
+        input_list = kwargs.get("input_list", [2, 1, 0])
+        expected = list(input_list) if isinstance(input_list, list) else None
+        try:
+            # noinspection PyTypeChecker
+            american_flag_partition(**{"input_list": input_list, "n_keys": 3, **kwargs})
+        except AttributeError:
+            if expected is None or input_list == expected:
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: the input list was changed before the exception.")
+                n_errors += 1
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    print("\t    Size | partition (s) | sorted (s), with 256 keys")
+    for e in range(4, 7):
+        values = [random.randrange(256) for _ in range(10 ** e)]
+        times = [measure(func, setup=lambda: (list(values),), warmup=0, repeat=3)["median_ns"] / 1e9
+                 for func in (partial(american_flag_partition, n_keys=256), sorted)]
+        print(f"\t{10 ** e:>8.0e} | {times[0]:>13.3f} | {times[1]:>10.3f}")
+    print("The partition runs in O(n) with O(k) extra memory, while the C implemented sorted is O(n log n) and needs")
+    print("an O(n) copy of the list.")
+
+    # Test set 7 - Parallel sort
+    print("\nUser test set 7 - Parallel counting and filling over shared memory.")
+    test = 0
+    for n in [1, 2, 5, 1000, COUNT_CHUNK_SIZE + 3]:
+        for workers in [2, 3]:
+            values = random.choices((0, 1, 2), k=n)
+            inputs = [bytearray(values)]
+            if np is not None:
+                inputs.append(np.array(values, dtype=np.uint8))
+            for input_list in inputs:
+                test += 1
+                timings = {}
+                actual = sort_012_parallel(input_list, max_workers=workers, timings=timings, min_parallel_size=0)
+                phases = {"copy", "count", "fill"}
+                if actual is input_list and list(actual) == sorted(values) and set(timings) == phases:
+                    print(f"Test {test} passed.")
+                else:
+                    print(f"Error test {test}: the parallel sort of {n} values with {workers} workers failed.")
+                    n_errors += 1
+
+            test += 1
+            shared = SharedMemory(create=True, size=n)
+            try:
+                shared.buf[:n] = bytes(values)
+                sort_012_parallel(shared, max_workers=workers)
+                if bytes(shared.buf[:n]) == bytes(sorted(values)):
+                    print(f"Test {test} passed.")
+                else:
+                    print(f"Error test {test}: the shared memory block of {n} values wasn't sorted in place.")
+                    n_errors += 1
+            finally:
+                shared.close()
+                shared.unlink()
+
+    for args in [([0, 1, 2],), (b"\x00\x01",), (bytearray(),), (bytearray([0, 1, 4] * 10), 2), (bytearray(3), 0)]:
+        test += 1
+        try:
+            # noinspection PyTypeChecker
+            sort_012_parallel(*args, min_parallel_size=0)
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    n_workers = max(os.cpu_count() or 1, 2)
+    print(f"\t    Size | serial (s) | copy (s) | count (s) | fill (s) | speedup, with {n_workers} workers on "
+          f"{os.cpu_count()} CPUs")
+    for e in range(7, 9):
+        values = random_bytes_012(10 ** e)
+        serial = measure(sort_012, setup=lambda: (bytearray(values),), warmup=0, repeat=1)["median_ns"] / 1e9
+        timings = {}
+        parallel = measure(sort_012_parallel, setup=lambda: (bytearray(values), n_workers, timings), warmup=0,
+                           repeat=1)["median_ns"] / 1e9
+        print(f"\t{10 ** e:>8.0e} | {serial:>10.3f} | {timings['copy']:>8.3f} | {timings['count']:>9.3f} | "
+              f"{timings['fill']:>8.3f} | {serial / parallel:>7.1f}")
+    print("The count and fill phases scale with the number of cores, the copies into and out of shared memory don't,")
+    print("so sort a SharedMemory block directly to avoid them.")
+
+    # Test set 8 - Streaming accumulator
+    print("\nUser test set 8 - Streaming accumulator of 0, 1 and 2 values.")
+    test = 0
+    for n_chunks in [1, 2, 10]:
+        accumulator = Sort012()
+        values = []
+        for _ in range(n_chunks):
+            chunk = random.choices((0, 1, 2), k=random.randint(1, 300))
+            values += chunk
+            updates = [lambda: [accumulator.add(value) for value in chunk], lambda: accumulator.extend(chunk),
+                       lambda: accumulator.extend(iter(chunk)), lambda: accumulator.extend(bytearray(chunk))]
+            if np is not None:
+                updates += [lambda: accumulator.extend(np.array(chunk)),
+                            lambda: accumulator.extend(np.array(chunk, dtype=np.int16)),
+                            lambda: accumulator.extend(np.array(chunk, dtype=np.uint8))]
+            random.choice(updates)()
+            test += 1
+            expected = sort_012(input_list=list(values))
+            runs = [value for value, start, count in accumulator.runs() for _ in range(count)]
+            if list(accumulator) == expected and runs == expected and len(accumulator) == len(values):
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: the accumulator of {len(values)} values doesn't match sort_012.")
+                n_errors += 1
+
+    test += 1
+    accumulator = Sort012(bytes([2, 0, 2, 2]))
+    if accumulator.runs() == [(0, 0, 1), (2, 1, 3)] and accumulator.counts == (1, 0, 3):
+        print(f"Test {test} passed.")
+    else:
+        print(f"Error test {test}: expected the runs [(0, 0, 1), (2, 1, 3)], but got {accumulator.runs()}.")
+        n_errors += 1
+
+    if np is not None:
+        for dtype in [np.int16, np.int32, np.int64, np.uint64]:
+            test += 1
+            accumulator = Sort012(np.array([2, 0, 1, 2], dtype=dtype))
+            if accumulator.counts == (1, 1, 2):
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: expected the counts (1, 1, 2) for a {dtype.__name__} array, but got "
+                      f"{accumulator.counts}.")
+                n_errors += 1
+
+    updates = [lambda a: a.add(3), lambda a: a.add("1"), lambda a: a.extend([0, 1, 5]), lambda a: a.extend([[0]]),
+               lambda a: a.extend("012"), lambda a: a.extend(7), lambda a: a.extend(bytearray([0, 9]))]
+    if np is not None:
+        updates += [lambda a: a.extend(np.array([0, 1, 3])), lambda a: a.extend(np.array([0, -1], dtype=np.int32)),
+                    lambda a: a.extend(np.zeros((2, 2), dtype=np.int64))]
+    for update in updates:
+        test += 1
+        accumulator = Sort012([1, 0])
+        try:
+            update(accumulator)
+        except AttributeError:
+            if accumulator.counts == (1, 1, 0):
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: the accumulator was changed before the exception.")
+                n_errors += 1
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
     print("\n*******************")
     if n_errors > 0:
         raise RuntimeError(f"BOO HOO, {n_errors} errors detected.\n")
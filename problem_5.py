@@ -1,7 +1,29 @@
 #!/usr/bin/env python3
+from array import array
+from bisect import bisect_left, insort
+from heapq import nsmallest
+from itertools import islice
+import mmap
+import multiprocessing
+import os
+from queue import Empty
 import random
-from time import time
+from string import ascii_lowercase
+from struct import Struct
 import sys
+import tempfile
+from time import perf_counter_ns
+import tracemalloc
+
+from benchmark import check_complexity, measure, percentile, print_scaling, scaling
+
+# The header of a saved FrozenTrie: the magic bytes, the byte order (0 little, 1 big), the item size of the node and
+# edge arrays, the number of nodes and the number of edges
+FROZEN_TRIE_HEADER = Struct("<8sBB6xQQ")
+FROZEN_TRIE_MAGIC = b"FTRIE\x00v1"
+
+# The seconds to wait for the result of a benchmark worker process before counting it as failed
+WORKER_TIMEOUT = 60
 
 
 class TrieNode:
@@ -10,21 +32,54 @@ class TrieNode:
         self.character = character
         self.word_end = False
         self.children = {}
-        self.suffix_list = []
 
     def insert(self, character):
         if character not in self.children.keys():
-            self.children[character] = TrieNode(character)
+            self.children[character] = type(self)(character)
+
+    def iter_suffixes(self, limit: int | None = None):
+        """Lazily yields the suffixes of all the words below this node, depth first in insertion order.
+
+        The nodes are visited with an explicit stack of child iterators instead of recursion, so chains of any depth
+        are safe, and the characters of the current path are kept in a single buffer that is only joined for the words
+        that are yielded, instead of concatenating a new string for every node.
+
+        Args:
+            limit (int | None): Only yield the first `limit` suffixes, all of them if None.
 
-    def collect_suffixes(self, suffix, node):
-        for character, node in node.children.items():
-            if node.word_end:
-                self.suffix_list.append(suffix + character)
-            self.collect_suffixes(suffix + character, node)
+        Yields:
+            str: The next suffix.
+        """
+        if limit is not None and limit <= 0:
+            return
+        n_yielded = 0
+        path = []
+        stack = [iter(self.children.items())]
+        while stack:
+            for character, node in stack[-1]:
+                path.append(character)
+                if node.word_end:
+                    yield "".join(path)
+                    n_yielded += 1
+                    if n_yielded == limit:
+                        return
+                stack.append(iter(node.children.items()))
+                break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
 
-    def suffixes(self):
-        self.collect_suffixes('', self)
-        return self.suffix_list
+    def suffixes(self, limit: int | None = None) -> list:
+        """Returns a new list of the suffixes of all the words below this node, see `iter_suffixes`.
+
+        Args:
+            limit (int | None): Only return the first `limit` suffixes, all of them if None.
+
+        Returns:
+            list: The suffixes.
+        """
+        return list(self.iter_suffixes(limit=limit))
 
 
 class Trie:
@@ -81,21 +136,879 @@ class Trie:
             node = node.children[character]
         return node
 
+    @staticmethod
+    def _sorted_words(words):
+        """Yields the non-empty words of a bulk load, checking that they are strings in sorted order.
+
+        Args:
+            words (iterable of str | text file): The words in sorted order, duplicates allowed, or a text file with a
+                sorted word per line, in which empty lines are skipped
+
+        Yields:
+            str: The words without line endings.
+
+        Raises:
+            AttributeError: If a word is not a string or the words are not sorted
+        """
+
+        # Check arguments
+        if isinstance(words, str) or not hasattr(words, "__iter__"):
+            raise AttributeError("The words must be an iterable of strings or a text file.")
+
+        previous = ""
+        for word in words:
+            if not isinstance(word, str):
+                raise AttributeError("The words must be strings.")
+            if hasattr(words, "read"):
+                word = word.rstrip("\r\n")
+            if len(word) == 0:
+                continue
+            if word < previous:
+                raise AttributeError(f"The words must be sorted, but {word!r} follows {previous!r}.")
+            yield word
+            previous = word
+
+    @classmethod
+    def bulk_load(cls, words) -> "Trie":
+        """Builds a trie of this class from sorted words in one streaming pass.
+
+        Since the words are sorted, a word only shares its common prefix with the previous word with the nodes built
+        so far, and every node after that prefix is new. The path of the previous word is kept, so the shared nodes
+        aren't looked up again and the new nodes are created without checking the children.
+
+        Args:
+            words (iterable of str | text file): The words in sorted order, duplicates allowed, or a text file with a
+                sorted word per line, in which empty lines are skipped
+
+        Returns:
+            Trie: The trie of all the words, an instance of the class it is called on.
+
+        Raises:
+            AttributeError: If a word is not a string or the words are not sorted
+        """
+        words = cls._sorted_words(words)
+        trie = cls()
+        node_class = type(trie.root)
+        path = [trie.root]
+        previous = ""
+        for word in words:
+            # Keep the path of the prefix shared with the previous word and append new nodes for the rest
+            shared = 0
+            for a, b in zip(word, previous):
+                if a != b:
+                    break
+                shared += 1
+            del path[shared + 1:]
+            node = path[-1]
+            for character in word[shared:]:
+                child = node_class(character)
+                node.children[character] = child
+                path.append(child)
+                node = child
+            node.word_end = True
+            previous = word
+        return trie
+
+    def freeze(self) -> "FrozenTrie":
+        """Returns an immutable, minimized copy of the trie, see `FrozenTrie`."""
+        return FrozenTrie.from_trie(self)
+
+
+class RankedTrieNode(TrieNode):
+    """A trie node with the accumulated weight of the word ending at it and a cache of the best completions below it."""
+
+    def __init__(self, character=None):
+        super().__init__(character)
+        self.weight = 0
+        self.top = []
+
+    def update_top(self, word: str, weight, cache_size: int):
+        """Updates the cache of the best completions with the new total weight of a word below this node.
+
+        The cache is a list of (-weight, word) keys in ascending order, i.e. by descending weight and then
+        alphabetically, with at most `cache_size` entries. Since weights only ever grow, a word that isn't in the
+        cache can only enter it with its new total weight, and no evicted word can be better than the cached ones.
+
+        Args:
+            word (str): The word whose weight grew.
+            weight (int | float): The new total weight of the word.
+            cache_size (int): The maximum number of cached completions.
+        """
+        top = self.top
+        key = (-weight, word)
+        if len(top) == cache_size and key > top[-1]:
+            return
+        for i, (_, cached_word) in enumerate(top):
+            if cached_word == word:
+                del top[i]
+                break
+        insort(top, key)
+        del top[cache_size:]
+
+
+class RankedTrie(Trie):
+    """A trie of weighted words that answers top k autocomplete queries from per node caches.
+
+    Every node caches its `cache_size` best completions, which are updated along the path of a word on every insert.
+    A top k query for k up to the cache size therefore only walks the prefix and copies k cached entries, so its time
+    doesn't depend on the number of words below the prefix.
+    """
+
+    def __init__(self, cache_size: int = 10):
+        """The object instantiation method.
+
+        Args:
+            cache_size (int): The number of best completions cached per node.
+
+        Raises:
+            AttributeError: If the cache size is not a positive integer.
+        """
+        if not isinstance(cache_size, int) or cache_size < 1:
+            raise AttributeError("The cache size must be a positive integer.")
+        super().__init__()
+        self.root = RankedTrieNode()
+        self.cache_size = cache_size
+
+    def insert(self, word: str, weight=1):
+        """Inserts the given word into the trie, or adds the weight to it if it is already there.
+
+        Args:
+            word (str): The word string to insert.
+            weight (int | float): The positive weight, e.g. a frequency or score, added to the word.
+
+        Raises:
+            AttributeError: If the word is not a string or the weight is not a positive number
+        """
+
+        # Check arguments
+        if not isinstance(word, str):
+            raise AttributeError("The word must be a string.")
+        if not isinstance(weight, (int, float)) or isinstance(weight, bool) or not weight > 0:
+            raise AttributeError("The weight must be a positive number.")
+
+        if len(word) > 0:
+            path = [self.root]
+            node = self.root
+            for character in word:
+                node.insert(character)
+                node = node.children[character]
+                path.append(node)
+            node.word_end = True
+            node.weight += weight
+            for path_node in path:
+                path_node.update_top(word, node.weight, self.cache_size)
+
+    @classmethod
+    def bulk_load(cls, words) -> "RankedTrie":
+        """Builds a ranked trie from sorted words, every occurrence of a word adding a weight of 1.
+
+        The streaming build of `Trie.bulk_load` doesn't maintain the weights and the caches of the best completions,
+        so the words are inserted one by one instead.
+
+        Args:
+            words (iterable of str | text file): The words in sorted order, duplicates allowed, or a text file with a
+                sorted word per line, in which empty lines are skipped
+
+        Returns:
+            RankedTrie: The ranked trie of all the words, with the default cache size.
+
+        Raises:
+            AttributeError: If a word is not a string or the words are not sorted
+        """
+        trie = cls()
+        for word in cls._sorted_words(words):
+            trie.insert(word)
+        return trie
+
+    def top_k(self, prefix: str, k: int = 10) -> list:
+        """Returns the k words with the highest weights that start with the given prefix.
+
+        For k up to the cache size the answer comes from the cache of the prefix node. Larger k fall back to
+        enumerating all the words below the prefix.
+
+        Args:
+            prefix (str): The prefix, the empty prefix matches all the words.
+            k (int): The maximum number of words to return.
+
+        Returns:
+            list: The (word, weight) pairs by descending weight, ties in alphabetical order.
+
+        Raises:
+            AttributeError: If the prefix is not a string or k is not a positive integer
+        """
+
+        # Check arguments
+        if not isinstance(prefix, str):
+            raise AttributeError("The prefix must be a string.")
+        if not isinstance(k, int) or k < 1:
+            raise AttributeError("The k must be a positive integer.")
+
+        node = self.root if len(prefix) == 0 else self.find(prefix)
+        if node is None:
+            return []
+        if k <= self.cache_size:
+            return [(word, -weight) for weight, word in node.top[:k]]
+
+        keys = []
+        if node.word_end:
+            keys.append((-node.weight, prefix))
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            for character, child in node.children.items():
+                if child.word_end:
+                    keys.append((-child.weight, word + character))
+                stack.append((child, word + character))
+        return [(word, -weight) for weight, word in nsmallest(k, keys)]
+
+
+class RadixTrieNode:
+    """A node of a `RadixTrie`, reached from its parent over an edge labelled with one or more characters."""
+    __slots__ = ("label", "word_end", "children")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.word_end = False
+        self.children = {}
+
+    def iter_suffixes(self, limit: int | None = None):
+        """Lazily yields the suffixes of all the words below this node, in the same order as `TrieNode.iter_suffixes`.
+
+        Args:
+            limit (int | None): Only yield the first `limit` suffixes, all of them if None.
+
+        Yields:
+            str: The next suffix.
+        """
+        if limit is not None and limit <= 0:
+            return
+        n_yielded = 0
+        path = []
+        stack = [iter(self.children.values())]
+        while stack:
+            for node in stack[-1]:
+                path.append(node.label)
+                if node.word_end:
+                    yield "".join(path)
+                    n_yielded += 1
+                    if n_yielded == limit:
+                        return
+                stack.append(iter(node.children.values()))
+                break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
+
+    def suffixes(self, limit: int | None = None) -> list:
+        """Returns a new list of the suffixes of all the words below this node, see `iter_suffixes`.
+
+        Args:
+            limit (int | None): Only return the first `limit` suffixes, all of them if None.
+
+        Returns:
+            list: The suffixes.
+        """
+        return list(self.iter_suffixes(limit=limit))
+
+
+class RadixEdgeHandle:
+    """A node-like handle for a prefix that ends part way along the edge to a `RadixTrieNode`.
+
+    No word ends inside an edge, and every word below the handle starts with the rest of the edge label.
+    """
+    __slots__ = ("node", "remainder")
+
+    def __init__(self, node: RadixTrieNode, remainder: str):
+        self.node = node
+        self.remainder = remainder
+
+    @property
+    def word_end(self) -> bool:
+        """bool: Always False, words only end at nodes."""
+        return False
+
+    def iter_suffixes(self, limit: int | None = None):
+        """Lazily yields the suffixes of all the words below the handle, see `RadixTrieNode.iter_suffixes`."""
+        if limit is not None and limit <= 0:
+            return
+        if self.node.word_end:
+            yield self.remainder
+            limit = None if limit is None else limit - 1
+        for suffix in self.node.iter_suffixes(limit=limit):
+            yield self.remainder + suffix
+
+    def suffixes(self, limit: int | None = None) -> list:
+        """Returns a new list of the suffixes of all the words below the handle, see `iter_suffixes`."""
+        return list(self.iter_suffixes(limit=limit))
+
+
+class RadixTrie:
+    """A path compressed (Patricia) trie with the `insert`, `find` and `suffixes` semantics of `Trie`.
+
+    Chains of nodes with a single child and no word end are merged into one edge labelled with their characters, so
+    a trie of w words has at most 2w nodes however long the words are. The children of a node are keyed by the first
+    character of their label, which is unique among siblings, and an edge is split in two when a new word diverges
+    part way along it.
+    """
+
+    def __init__(self):
+        self.root = RadixTrieNode()
+
+    def insert(self, word: str):
+        """Inserts the given word into the trie.
+
+        Args:
+            word (str): The word string to insert.
+
+        Raises:
+            AttributeError: If the argument is not a string
+        """
+
+        # Check arguments
+        if not isinstance(word, str):
+            raise AttributeError("The word must be a string.")
+
+        if len(word) > 0:
+            node = self.root
+            i = 0
+            while i < len(word):
+                child = node.children.get(word[i])
+                if child is None:
+                    child = RadixTrieNode(word[i:])
+                    node.children[word[i]] = child
+                    node = child
+                    break
+
+                label = child.label
+                if word.startswith(label, i):
+                    node = child
+                    i += len(label)
+                    continue
+
+                # Split the edge after the characters it shares with the word, found by comparing doubling blocks
+                # and then halving ones, so there are O(log n) comparisons of O(n) characters in total
+                j = 1
+                block = 1
+                while word.startswith(label[j:j + block], i + j):
+                    j += block
+                    block *= 2
+                while block > 1:
+                    block //= 2
+                    if word.startswith(label[j:j + block], i + j):
+                        j += block
+                middle = RadixTrieNode(label[:j])
+                child.label = label[j:]
+                middle.children[child.label[0]] = child
+                node.children[word[i]] = middle
+                node = middle
+                i += j
+            node.word_end = True
+
+    def find(self, prefix: str) -> RadixTrieNode | RadixEdgeHandle | None:
+        """Returns the node at the end of the given prefix, a handle if it ends inside an edge, or None if not found.
+
+        Args:
+            prefix (str): The Prefix to search for
+
+        Returns:
+            RadixTrieNode | RadixEdgeHandle | None: The desired node or handle, or None if not found
+
+        Raises:
+            AttributeError: If the argument is not a string
+        """
+
+        # Check arguments
+        if not isinstance(prefix, str):
+            raise AttributeError("The prefix must be a string.")
+
+        # Check for empty prefixes
+        if len(prefix) == 0:
+            return None
+
+        node = self.root
+        i = 0
+        while i < len(prefix):
+            child = node.children.get(prefix[i])
+            if child is None:
+                return None
+            label = child.label
+            if prefix.startswith(label, i):
+                node = child
+                i += len(label)
+            elif label.startswith(prefix[i:]):
+                return RadixEdgeHandle(child, label[len(prefix) - i:])
+            else:
+                return None
+        return node
+
+
+class CompactTrieNode:
+    """A lightweight handle to a node of a `CompactTrie`, with the `word_end` and `suffixes` API of `TrieNode`."""
+    __slots__ = ("trie", "index")
+
+    def __init__(self, trie, index: int):
+        self.trie = trie
+        self.index = index
+
+    @property
+    def character(self) -> str | None:
+        """str | None: The character of the node, None for the root."""
+        return chr(self.trie.labels[self.index]) if self.index > 0 else None
+
+    @property
+    def word_end(self) -> bool:
+        """bool: True if a word ends at this node."""
+        return bool(self.trie.word_end[self.index])
+
+    def iter_suffixes(self, limit: int | None = None):
+        """Lazily yields the suffixes of all the words below this node, in the same order as `TrieNode.iter_suffixes`.
+
+        The nodes are visited depth first with an explicit stack, so there is no recursion limit, and the characters of
+        the current path are kept in a single buffer that is joined for every word end.
+
+        Args:
+            limit (int | None): Only yield the first `limit` suffixes, all of them if None.
+
+        Yields:
+            str: The next suffix.
+        """
+        labels = self.trie.labels
+        first_child = self.trie.first_child
+        next_sibling = self.trie.next_sibling
+        word_end = self.trie.word_end
+        if limit is not None and limit <= 0:
+            return
+        n_yielded = 0
+        path = []
+        stack = [(first_child[self.index], 0)]
+        while stack and n_yielded != limit:
+            index, depth = stack.pop()
+            if index < 0:
+                continue
+            stack.append((next_sibling[index], depth))
+            del path[depth:]
+            path.append(chr(labels[index]))
+            if word_end[index]:
+                yield "".join(path)
+                n_yielded += 1
+            stack.append((first_child[index], depth + 1))
+
+    def suffixes(self, limit: int | None = None) -> list:
+        """Returns a new list of the suffixes of all the words below this node, see `iter_suffixes`.
+
+        Args:
+            limit (int | None): Only return the first `limit` suffixes, all of them if None.
+
+        Returns:
+            list: The suffixes.
+        """
+        return list(self.iter_suffixes(limit=limit))
+
+
+class CompactTrie:
+    """A trie with the `insert` and `find` API of `Trie` that stores its nodes in parallel arrays instead of objects.
+
+    Node i has the character code `labels[i]`, its first child `first_child[i]`, its next sibling `next_sibling[i]`
+    (-1 for none) and `word_end[i]`, about 13 bytes per node instead of a `TrieNode` object with a dict and a list.
+    The children of a node are a linked list of siblings in insertion order, so a step down the trie is a scan of
+    the siblings, at most the size of the alphabet. Node 0 is the root.
+    """
+
+    def __init__(self):
+        self.labels = array("I", [0])
+        self.first_child = array("i", [-1])
+        self.next_sibling = array("i", [-1])
+        self.word_end = bytearray(1)
+
+    def __len__(self) -> int:
+        """Returns the number of nodes, including the root."""
+        return len(self.labels)
+
+    @property
+    def root(self) -> CompactTrieNode:
+        """CompactTrieNode: A handle to the root node."""
+        return CompactTrieNode(self, 0)
+
+    def insert(self, word: str):
+        """Inserts the given word into the trie.
+
+        Args:
+            word (str): The word string to insert.
+
+        Raises:
+            AttributeError: If the argument is not a string
+        """
+
+        # Check arguments
+        if not isinstance(word, str):
+            raise AttributeError("The word must be a string.")
+
+        if len(word) > 0:
+            labels = self.labels
+            first_child = self.first_child
+            next_sibling = self.next_sibling
+            index = 0
+            for character in word:
+                code = ord(character)
+                child = first_child[index]
+                last = -1
+                while child >= 0 and labels[child] != code:
+                    last = child
+                    child = next_sibling[child]
+                if child < 0:
+                    child = len(labels)
+                    labels.append(code)
+                    first_child.append(-1)
+                    next_sibling.append(-1)
+                    self.word_end.append(0)
+                    if last < 0:
+                        first_child[index] = child
+                    else:
+                        next_sibling[last] = child
+                index = child
+            self.word_end[index] = 1
+
+    def find(self, prefix: str) -> CompactTrieNode | None:
+        """Returns a handle to the node at the end of the given prefix or None is not found.
+
+        Args:
+            prefix (str): The Prefix to search for
+
+        Returns:
+            CompactTrieNode | None: The desired node or None if not found
+
+        Raises:
+            AttributeError: If the argument is not a string
+        """
+
+        # Check arguments
+        if not isinstance(prefix, str):
+            raise AttributeError("The prefix must be a string.")
+
+        # Check for empty prefixes
+        if len(prefix) == 0:
+            return None
+
+        labels = self.labels
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        index = 0
+        for character in prefix:
+            code = ord(character)
+            index = first_child[index]
+            while index >= 0 and labels[index] != code:
+                index = next_sibling[index]
+            if index < 0:
+                return None
+        return CompactTrieNode(self, index)
+
+
+class FrozenTrieNode:
+    """A lightweight handle to a node of a `FrozenTrie`, with the `word_end` and `suffixes` API of `TrieNode`."""
+    __slots__ = ("trie", "index")
+
+    def __init__(self, trie, index: int):
+        self.trie = trie
+        self.index = index
+
+    @property
+    def word_end(self) -> bool:
+        """bool: True if a word ends at this node."""
+        return bool(self.trie.word_end[self.index])
+
+    def iter_suffixes(self, limit: int | None = None):
+        """Lazily yields the suffixes of all the words below this node in alphabetical order.
+
+        Args:
+            limit (int | None): Only yield the first `limit` suffixes, all of them if None.
+
+        Yields:
+            str: The next suffix.
+        """
+        if limit is not None and limit <= 0:
+            return
+        edge_start = self.trie.edge_start
+        labels = self.trie.labels
+        targets = self.trie.targets
+        word_end = self.trie.word_end
+        n_yielded = 0
+        path = []
+        stack = [iter(range(edge_start[self.index], edge_start[self.index + 1]))]
+        while stack:
+            for edge in stack[-1]:
+                path.append(chr(labels[edge]))
+                child = targets[edge]
+                if word_end[child]:
+                    yield "".join(path)
+                    n_yielded += 1
+                    if n_yielded == limit:
+                        return
+                stack.append(iter(range(edge_start[child], edge_start[child + 1])))
+                break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
+
+    def suffixes(self, limit: int | None = None) -> list:
+        """Returns a new list of the suffixes of all the words below this node, see `iter_suffixes`.
+
+        Args:
+            limit (int | None): Only return the first `limit` suffixes, all of them if None.
+
+        Returns:
+            list: The suffixes.
+        """
+        return list(self.iter_suffixes(limit=limit))
+
+
+class FrozenTrie:
+    """An immutable, minimized trie (a DAWG) with the `find` and `suffixes` API of `Trie`, stored in flat arrays.
+
+    Identical subtrees, such as the common endings of many words, are stored once, so nodes can have several parents.
+    The edges of node i are `edge_start[i]` to `edge_start[i + 1]`, sorted by their character code in `labels`, with
+    the node they lead to in `targets`, and a child is found with a binary search. Node 0 is the root.
+    """
+
+    def __init__(self, edge_start, labels, targets, word_end):
+        """The object instantiation method, see `from_trie` to freeze a trie.
+
+        Args:
+            edge_start (sequence of int): The first edge of every node, with one extra entry for the end of the edges.
+            labels (sequence of int): The character code of every edge, sorted per node.
+            targets (sequence of int): The node every edge leads to.
+            word_end (sequence of int): 1 if a word ends at the node, else 0.
+        """
+        self.edge_start = edge_start
+        self.labels = labels
+        self.targets = targets
+        self.word_end = word_end
+        self.mapping = None
+
+    @classmethod
+    def from_trie(cls, trie: Trie) -> "FrozenTrie":
+        """Minimizes and freezes the given trie.
+
+        The nodes are visited in post order with an explicit stack, and every node is given the class of its word end
+        and its labelled child classes, so equal subtrees get the same class. The classes are then numbered breadth
+        first from the root and written to the arrays.
+
+        Args:
+            trie (Trie): The trie to freeze.
+
+        Returns:
+            FrozenTrie: The minimized trie.
+        """
+        classes = {}
+        signatures = []
+        child_classes = []
+        stack = [(trie.root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.children.values()))
+                continue
+            n_children = len(node.children)
+            children = child_classes[len(child_classes) - n_children:]
+            del child_classes[len(child_classes) - n_children:]
+            signature = (node.word_end, tuple(sorted(zip(map(ord, node.children), children))))
+            node_class = classes.setdefault(signature, len(signatures))
+            if node_class == len(signatures):
+                signatures.append(signature)
+            child_classes.append(node_class)
+
+        order = {child_classes[0]: 0}
+        queue = [child_classes[0]]
+        for node_class in queue:
+            for _, child in signatures[node_class][1]:
+                if child not in order:
+                    order[child] = len(queue)
+                    queue.append(child)
+
+        edge_start = array("I")
+        labels = array("I")
+        targets = array("I")
+        word_end = bytearray()
+        for node_class in queue:
+            end, edges = signatures[node_class]
+            edge_start.append(len(labels))
+            word_end.append(end)
+            for code, child in edges:
+                labels.append(code)
+                targets.append(order[child])
+        edge_start.append(len(labels))
+        return cls(edge_start, labels, targets, word_end)
+
+    def save(self, path: str):
+        """Saves the trie in a binary file that `load` can memory map.
+
+        The file is a `FROZEN_TRIE_HEADER` followed by the raw `edge_start`, `labels`, `targets` and `word_end` arrays
+        in the native byte order, so every section can be used in place without parsing.
+
+        Args:
+            path (str): The path of the file.
+        """
+        itemsize = array("I").itemsize
+        with open(path, "wb") as file:
+            file.write(FROZEN_TRIE_HEADER.pack(FROZEN_TRIE_MAGIC, sys.byteorder == "big", itemsize, len(self),
+                                               len(self.labels)))
+            for values in (self.edge_start, self.labels, self.targets):
+                file.write(values if isinstance(values, (array, memoryview)) else array("I", values))
+            file.write(self.word_end)
+
+    @classmethod
+    def load(cls, path: str) -> "FrozenTrie":
+        """Memory maps a trie saved by `save` and answers queries directly from the mapped pages.
+
+        Nothing is parsed or copied, the arrays are `memoryview` casts of the mapped file, so loading is O(1) and the
+        pages are only read from the page cache when a query touches them. Processes that load the same file share
+        its pages. Call `close` to unmap the file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            FrozenTrie: The memory mapped trie.
+
+        Raises:
+            AttributeError: If the file isn't a saved trie of this platform's byte order and item size
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < FROZEN_TRIE_HEADER.size:
+                raise AttributeError("The file is not a saved FrozenTrie.")
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, big_endian, itemsize, n_nodes, n_edges = FROZEN_TRIE_HEADER.unpack_from(mapping)
+        sizes = [(n_nodes + 1) * itemsize, n_edges * itemsize, n_edges * itemsize, n_nodes]
+        if magic != FROZEN_TRIE_MAGIC or n_nodes < 1 or len(mapping) != FROZEN_TRIE_HEADER.size + sum(sizes):
+            mapping.close()
+            raise AttributeError("The file is not a saved FrozenTrie.")
+        if big_endian != (sys.byteorder == "big") or itemsize != array("I").itemsize:
+            mapping.close()
+            raise AttributeError("The file was saved with a different byte order or item size.")
+
+        # The edges of the last node must end with the edge arrays
+        offset = FROZEN_TRIE_HEADER.size + n_nodes * itemsize
+        if int.from_bytes(mapping[offset:offset + itemsize], sys.byteorder) != n_edges:
+            mapping.close()
+            raise AttributeError("The file is not a saved FrozenTrie.")
+
+        view = memoryview(mapping)
+        sections = []
+        offset = FROZEN_TRIE_HEADER.size
+        for size in sizes:
+            sections.append(view[offset:offset + size])
+            offset += size
+        trie = cls(*[section.cast("I") for section in sections[:3]], sections[3])
+        trie.mapping = (mapping, view, sections)
+        return trie
+
+    def close(self):
+        """Unmaps the file of a trie returned by `load`, after which the trie can't be used."""
+        if self.mapping is None:
+            return
+        mapping, view, sections = self.mapping
+        for values in (self.edge_start, self.labels, self.targets, *sections, view):
+            values.release()
+        mapping.close()
+        self.mapping = None
+
+    def __len__(self) -> int:
+        """Returns the number of nodes, including the root."""
+        return len(self.word_end)
+
+    @property
+    def nbytes(self) -> int:
+        """int: The number of bytes of the arrays."""
+        return sum(len(values) * getattr(values, "itemsize", 1)
+                   for values in (self.edge_start, self.labels, self.targets, self.word_end))
+
+    @property
+    def root(self) -> FrozenTrieNode:
+        """FrozenTrieNode: A handle to the root node."""
+        return FrozenTrieNode(self, 0)
+
+    def find(self, prefix: str) -> FrozenTrieNode | None:
+        """Returns a handle to the node at the end of the given prefix or None is not found.
+
+        Args:
+            prefix (str): The Prefix to search for
+
+        Returns:
+            FrozenTrieNode | None: The desired node or None if not found
+
+        Raises:
+            AttributeError: If the argument is not a string
+        """
+
+        # Check arguments
+        if not isinstance(prefix, str):
+            raise AttributeError("The prefix must be a string.")
+
+        # Check for empty prefixes
+        if len(prefix) == 0:
+            return None
+
+        edge_start = self.edge_start
+        labels = self.labels
+        targets = self.targets
+        index = 0
+        for character in prefix:
+            code = ord(character)
+            end = edge_start[index + 1]
+            edge = bisect_left(labels, code, edge_start[index], end)
+            if edge == end or labels[edge] != code:
+                return None
+            index = targets[edge]
+        return FrozenTrieNode(self, index)
+
+
+def count_nodes(trie) -> int:
+    """Returns the number of nodes of a `Trie`, `RadixTrie`, `CompactTrie` or `FrozenTrie`, including the root."""
+    if isinstance(trie, (CompactTrie, FrozenTrie)):
+        return len(trie)
+    n_nodes = 0
+    stack = [trie.root]
+    while stack:
+        node = stack.pop()
+        n_nodes += 1
+        stack.extend(node.children.values())
+    return n_nodes
+
+
+def bytes_per_node(trie_class, words: list) -> float:
+    """Returns the memory allocated per node, measured with `tracemalloc`, to build a trie of the given words."""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        trie = trie_class()
+        for word in words:
+            trie.insert(word=word)
+        allocated = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    return allocated / count_nodes(trie)
+
 
 def given_tests() -> int:
     print("\nThe given tests were in a Jupyter Notebook Widget that can't be executed in this environment.")
     return 0
 
 
-def test_invalid_insert_arguments() -> int:
+def test_invalid_insert_arguments(trie_class=Trie) -> int:
     """Test the insert method with invalid arguments.
 
+    Args:
+        trie_class (type): The trie implementation to test.
+
     Returns:
         int: The number of errors
     """
     test = 0
     n_errors = 0
-    good_trie = Trie()
+    good_trie = trie_class()
     for arg in [3.5, 2, [], None]:
         test += 1
         try:
@@ -110,15 +1023,18 @@ def test_invalid_insert_arguments() -> int:
     return n_errors
 
 
-def test_invalid_find_arguments() -> int:
+def test_invalid_find_arguments(trie_class=Trie) -> int:
     """Test the find method with invalid arguments.
 
+    Args:
+        trie_class (type): The trie implementation to test.
+
     Returns:
         int: The number of errors
     """
     test = 0
     n_errors = 0
-    good_trie = Trie()
+    good_trie = trie_class()
     for arg in [3.5, 2, [], None]:
         test += 1
         try:
@@ -133,9 +1049,12 @@ def test_invalid_find_arguments() -> int:
     return n_errors
 
 
-def test_find() -> int:
+def test_find(trie_class=Trie) -> int:
     """Test the find method.
 
+    Args:
+        trie_class (type): The trie implementation to test.
+
     Returns:
         int: The number of errors
     """
@@ -146,7 +1065,7 @@ def test_find() -> int:
     suffixes = ["".join([chr(random.randint(97, 122)) for _ in range(random.randint(1, 5))]) for __ in range(10)]
     words = ["".join(suffixes[:i]) for i in range(1, len(suffixes)+1)]
 
-    trie = Trie()
+    trie = trie_class()
     for word in words:
         trie.insert(word=word)
 
@@ -178,9 +1097,12 @@ def test_find() -> int:
     return n_errors
 
 
-def test_suffixes() -> int:
+def test_suffixes(trie_class=Trie) -> int:
     """Test the "suffixes" method.
 
+    Args:
+        trie_class (type): The trie implementation to test.
+
     Returns:
         int: The number of errors
     """
@@ -191,7 +1113,7 @@ def test_suffixes() -> int:
     suffixes = ["".join([chr(random.randint(97, 122)) for _ in range(random.randint(2, 5))]) for __ in range(10)]
     words = ["".join(suffixes[:i]) for i in range(1, len(suffixes)+1)]
 
-    trie = Trie()
+    trie = trie_class()
     for word in words:
         trie.insert(word=word)
 
@@ -212,89 +1134,600 @@ def test_suffixes() -> int:
     return n_errors
 
 
+def random_word(n_characters: int) -> str:
+    """Returns a random lower case word of the given length."""
+    return "".join(random.choices(ascii_lowercase, k=n_characters))
+
+
+def word_trie(word: str, trie_class=Trie) -> Trie:
+    """Returns a trie containing only the given word."""
+    trie = trie_class()
+    trie.insert(word=word)
+    return trie
+
+
+def benchmark_cases() -> list:
+    """The scaling benchmark cases of this problem, see `benchmark.scaling`.
+
+    Returns:
+        list: The keyword arguments of every scaling benchmark.
+    """
+    sizes = [10 ** e for e in range(5, 8)]
+    return [
+        dict(name="problem_5.Trie.insert", func=Trie.insert, setup=lambda n: (Trie(), random_word(n)), sizes=sizes,
+             expected="O(n)", warmup=0, repeat=3, fresh_input=True),
+        dict(name="problem_5.Trie.find", func=Trie.find, setup=lambda n: (word_trie(word := random_word(n)), word),
+             sizes=sizes, expected="O(n)", repeat=3),
+        dict(name="problem_5.TrieNode.suffixes", func=TrieNode.suffixes,
+             setup=lambda n: (word_trie(random_word(n)).root,), sizes=[10 ** e for e in range(4, 7)], expected="O(n)",
+             repeat=3),
+        dict(name="problem_5.CompactTrie.insert", func=CompactTrie.insert,
+             setup=lambda n: (CompactTrie(), random_word(n)), sizes=sizes, expected="O(n)", warmup=0, repeat=3,
+             fresh_input=True),
+        dict(name="problem_5.CompactTrie.find", func=CompactTrie.find,
+             setup=lambda n: (word_trie(word := random_word(n), CompactTrie), word), sizes=sizes, expected="O(n)",
+             repeat=3),
+        dict(name="problem_5.CompactTrieNode.suffixes", func=CompactTrieNode.suffixes,
+             setup=lambda n: (word_trie(random_word(n), CompactTrie).root,),
+             sizes=[10 ** e for e in range(4, 7)], expected="O(n)", repeat=3),
+        # A single edge split is too quick and noisy to pin down a complexity class, so it is only reported
+        dict(name="problem_5.RadixTrie.insert", func=RadixTrie.insert,
+             setup=lambda n: (word_trie(word := random_word(n), RadixTrie), word[:-1] + "_"), sizes=sizes,
+             expected=None, warmup=0, repeat=3, fresh_input=True),
+        dict(name="problem_5.RadixTrie.find", func=RadixTrie.find,
+             setup=lambda n: (word_trie(word := random_word(n), RadixTrie), word), sizes=sizes, expected="O(n)",
+             repeat=3),
+    ]
+
+
 def test_scale() -> int:
     """Test the time complexity for the find and insert.
 
+    The timings are only reported. Wall-clock times depend on the machine load, so times that don't scale like the
+    expected complexity only print a warning instead of counting as an error.
+
+    Returns:
+        int: Always 0, the number of errors
+    """
+    for case in [case for case in benchmark_cases() if not case["name"].endswith(".suffixes")]:
+        result = scaling(**case)
+        print_scaling(result)
+        if result["expected"] is not None and not check_complexity(result):
+            print(f"Warning: the times of {result['name']} don't scale like {result['expected']}, which can happen "
+                  f"when the machine is busy.")
+    print("You can see the scaled time is rising very close to n.")
+    print("This agrees with a time complexity of O(n).")
+
+    return 0
+
+
+def test_scale_suffixes() -> int:
+    """Test the time complexity for the "suffixes" method.
+
+    The timings are only reported. Wall-clock times depend on the machine load, so times that don't scale like the
+    expected complexity only print a warning instead of counting as an error.
+
+    Returns:
+        int: Always 0, the number of errors
+    """
+    for case in [case for case in benchmark_cases() if case["name"].endswith(".suffixes")]:
+        result = scaling(**case)
+        print_scaling(result)
+        if result["expected"] is not None and not check_complexity(result):
+            print(f"Warning: the times of {result['name']} don't scale like {result['expected']}, which can happen "
+                  f"when the machine is busy.")
+    print("You can see the scaled time is rising very close to n.")
+    print("This agrees with a time complexity of O(n).")
+
+    return 0
+
+
+def test_compact_trie() -> int:
+    """Test that the compact trie finds the same nodes and suffixes as the trie.
+
     Returns:
         int: The number of errors
     """
+    n_errors = 0
+    for trie_test in [test_invalid_insert_arguments, test_invalid_find_arguments, test_find, test_suffixes]:
+        n_errors += trie_test(trie_class=CompactTrie)
 
-    insert_times = []
-    find_times = []
-    e_values = [5 + i for i in range(3)]
     test = 0
-    for e in e_values:
-        trie = Trie()
-        word = "".join([chr(random.randint(97, 122)) for _ in range(10**e)])
+    words = [random_word(random.randint(1, 8)) for _ in range(2000)] + ["", "a", "ab", "abc", "b"]
+    trie = Trie()
+    compact_trie = CompactTrie()
+    for word in words:
+        trie.insert(word=word)
+        compact_trie.insert(word=word)
+    for prefix in dict.fromkeys(["", "a", "ab", "zz", "q", "xyz", "abcdefghij"] + [word[:2] for word in words[:20]]):
+        test += 1
+        expected = trie.find(prefix=prefix)
+        actual = compact_trie.find(prefix=prefix)
+        if (expected is None and actual is None) or (
+                expected is not None and actual is not None and expected.word_end == actual.word_end and
+                expected.suffixes() == actual.suffixes()):
+            print(f"Test {test} passed.")
+        else:
+            print(f"Test {test} failed: prefix = {prefix}, the compact trie doesn't match the trie.")
+            n_errors += 1
 
+    test += 1
+    if count_nodes(trie) == count_nodes(compact_trie):
+        print(f"Test {test} passed.")
+    else:
+        print(f"Test {test} failed: the tries have {count_nodes(trie)} and {count_nodes(compact_trie)} nodes.")
+        n_errors += 1
+
+    print("\t                      Words | nodes | trie (bytes/node) | compact (bytes/node)")
+    for label, words in [("10^4 random words", [random_word(random.randint(1, 10)) for _ in range(10 ** 4)]),
+                         ("10^5 random words", [random_word(random.randint(1, 10)) for _ in range(10 ** 5)]),
+                         ("one 10^6 character word", [random_word(10 ** 6)])]:
+        trie_bytes = bytes_per_node(Trie, words)
+        compact_bytes = bytes_per_node(CompactTrie, words)
+        compact_trie = CompactTrie()
+        for word in words:
+            compact_trie.insert(word=word)
+        print(f"\t{label:>27} | {len(compact_trie):>5.0e} | {trie_bytes:>17.0f} | {compact_bytes:>20.1f}")
         test += 1
-        start_time = time()
-        trie.insert(word=word)
-        insert_times.append(time() - start_time)
-        print(f"\tTest {test} insert completed in {insert_times[-1]:.2f} seconds for n = 10^{e}.")
+        if compact_bytes < trie_bytes / 10:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Test {test} failed: the compact trie uses {compact_bytes:.1f} bytes per node.")
+            n_errors += 1
+
+    return n_errors
+
+
+def test_iter_suffixes() -> int:
+    """Test the lazy and limited suffix enumeration of both tries, including chains too deep for recursion.
+
+    Returns:
+        int: The number of errors
+    """
+    test = 0
+    n_errors = 0
+    words = [random_word(random.randint(1, 6)) for _ in range(3000)]
+    chain = random_word(10 ** 6)
+    for trie_class in [Trie, CompactTrie]:
+        trie = trie_class()
+        for word in words:
+            trie.insert(word=word)
+        for prefix in ["a", "b", "zz"]:
+            node = trie.find(prefix=prefix)
+            if node is None:
+                continue
+            expected = sorted({word[len(prefix):] for word in words if word.startswith(prefix) and word != prefix})
+            first = node.suffixes()
+            for k in [0, 1, 5, len(first), len(first) + 3]:
+                test += 1
+                actual = node.suffixes(limit=k)
+                if sorted(first) == expected and node.suffixes() == first and actual == first[:k] and \
+                        list(islice(node.iter_suffixes(), k)) == actual:
+                    print(f"Test {test} passed.")
+                else:
+                    print(f"Test {test} failed: {trie_class.__name__} prefix = {prefix}, limit = {k}.")
+                    n_errors += 1
 
         test += 1
-        start_time = time()
-        trie.find(prefix=word)
-        find_times.append(time() - start_time)
-        print(f"\tTest {test} find completed in {find_times[-1]:.2f} seconds for n = 10^{e}.")
-
-    print("")
-    print("\t     |  time in sec   |      |  Scaled time")
-    print("\tSize | insert |  find |   n  | insert | find")
-    print("\t--------------------------------------------")
+        trie = trie_class()
+        for end in range(10 ** 5, 10 ** 6 + 1, 10 ** 5):
+            trie.insert(word=chain[:end])
+        actual = trie.find(prefix=chain[0]).suffixes()
+        if actual == [chain[1:end] for end in range(10 ** 5, 10 ** 6 + 1, 10 ** 5)]:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Test {test} failed: {trie_class.__name__} the suffixes of a 10^6 deep chain are wrong.")
+            n_errors += 1
+
+    print("\t   Words | all suffixes (ms) | first 10 (ms)")
+    for e in range(3, 6):
+        trie = Trie()
+        for _ in range(10 ** e):
+            trie.insert(word=random_word(random.randint(1, 10)))
+        times = [measure(trie.root.suffixes, setup=lambda: (limit,), repeat=3)["median_ns"] / 1e6
+                 for limit in (None, 10)]
+        print(f"\t{10 ** e:>8.0e} | {times[0]:>17.3f} | {times[1]:>13.4f}")
+    print("The first k suffixes only visit the nodes up to the k-th word, independent of the size of the trie.")
+
+    return n_errors
+
+
+def ranked_corpus(n_words: int) -> dict:
+    """Returns n random words from a small alphabet, so many share prefixes, with Pareto distributed weights."""
+    return {random_word(random.randint(3, 10)).translate(str.maketrans(ascii_lowercase, "abcdefgh" * 3 + "ab")):
+            int(random.paretovariate(1.2)) for _ in range(n_words)}
+
+
+def test_top_k(n_words: int = 10 ** 5) -> int:
+    """Test the ranked trie against sorting all the matching words, and measure the top k query latency.
+
+    Args:
+        n_words (int): The number of words in the latency benchmark corpus.
+
+    Returns:
+        int: The number of errors
+    """
+    test = 0
     n_errors = 0
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        s_insert = insert_times[i]/insert_times[0]
-        s_find = find_times[i]/find_times[0]
-        line = f"\t10^{e_values[i]} | {insert_times[i]:>6.3f} | {find_times[i]:.3f} | {n:>4} | "
-        line += f"{s_insert:>6.1f} | {s_find:>6.1f}"
-        print(line)
-        if (s_insert/n > 3) or (s_insert/n < 0.5) or (s_find/n > 3) or (s_find/n < 0.5):
-            print(f"Time complexity check for n = {n} failed.")
+    for cache_size in [1, 3, 10]:
+        trie = RankedTrie(cache_size=cache_size)
+        weights = {}
+        for _ in range(3000):
+            word = random_word(random.randint(1, 4)).translate(str.maketrans(ascii_lowercase, "abcd" * 6 + "ab"))
+            weight = random.choice([1, 2, 5, 0.5])
+            weights[word] = weights.get(word, 0) + weight
+            trie.insert(word=word, weight=weight)
+        for prefix in ["", "a", "ab", "dc", "abc", "x"]:
+            ranked = sorted((-weight, word) for word, weight in weights.items() if word.startswith(prefix))
+            for k in [1, cache_size, cache_size + 5]:
+                test += 1
+                actual = trie.top_k(prefix=prefix, k=k)
+                expected = [(word, -weight) for weight, word in ranked[:k]]
+                if actual == expected:
+                    print(f"Test {test} passed.")
+                else:
+                    print(f"Test {test} failed: prefix = {prefix}, k = {k}, expected {expected}, but got {actual}.")
+                    n_errors += 1
+
+    test += 1
+    trie = RankedTrie()
+    trie.insert(word="abc")
+    if all(isinstance(trie.find(prefix=prefix), RankedTrieNode) for prefix in ["a", "ab", "abc"]):
+        print(f"Test {test} passed.")
+    else:
+        print(f"Test {test} failed: the ranked trie nodes aren't RankedTrieNodes.")
+        n_errors += 1
+
+    for kwargs in [dict(cache_size=0), dict(word=3), dict(weight=0), dict(weight=-1), dict(weight="1"),
+                   dict(weight=True), dict(prefix=None), dict(k=0), dict(k=2.5)]:
+        test += 1
+        try:
+            # noinspection PyTypeChecker
+            trie = RankedTrie(cache_size=kwargs.get("cache_size", 10))
+            trie.insert(word=kwargs.get("word", "abc"), weight=kwargs.get("weight", 1))
+            trie.top_k(prefix=kwargs.get("prefix", "a"), k=kwargs.get("k", 3))
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
             n_errors += 1
-    print("You can see the scaled time is rising very close to n.")
-    print("This agrees with a time complexity of O(n).")
+
+    corpus = ranked_corpus(n_words)
+    trie = RankedTrie(cache_size=10)
+    for word, weight in corpus.items():
+        trie.insert(word=word, weight=weight)
+    words = list(corpus)
+    print(f"\t{len(corpus):.0e} words | median (us) | p99 (us) | subtree words")
+    for length in [1, 2, 4]:
+        prefixes = [random.choice(words)[:length] for _ in range(2000)]
+        times = [measure(trie.top_k, setup=lambda: (prefix, 10), warmup=0, repeat=1)["median_ns"] / 1e3
+                 for prefix in prefixes]
+        subtree = sum(word.startswith(prefixes[0]) for word in words)
+        print(f"\tprefix length {length} | {percentile(times, 50):>11.2f} | {percentile(times, 99):>8.2f} | "
+              f"{subtree:>13}")
+    print("The latency only grows with the prefix length, even though the short prefixes match far more words.")
 
     return n_errors
 
 
-def test_scale_suffixes() -> int:
-    """Test the time complexity for the "suffixes" method.
+def url_corpus(n_words: int) -> list:
+    """Returns n random URL paths and SKUs, long keys that share long prefixes."""
+    words = []
+    for _ in range(n_words // 2):
+        words.append(f"https://shop.example.com/api/v2/customers/{random.randrange(10 ** 4):06d}/orders/"
+                     f"{random.randrange(10 ** 6):08d}")
+        words.append(f"SKU-{random.choice(['ELEC', 'HOME', 'TOYS'])}-{random_word(3).upper()}-"
+                     f"{random.randrange(10 ** 5)}")
+    return words
+
+
+def test_radix_trie() -> int:
+    """Test that the radix trie finds the same nodes and suffixes as the trie, and compare their sizes.
 
     Returns:
         int: The number of errors
     """
-    sys.setrecursionlimit(1008)
+    n_errors = 0
+    for trie_test in [test_invalid_insert_arguments, test_invalid_find_arguments, test_find, test_suffixes]:
+        n_errors += trie_test(trie_class=RadixTrie)
+
+    test = 0
+    for words in [[random_word(random.randint(1, 6)).translate(str.maketrans(ascii_lowercase, "abc" * 8 + "ab"))
+                   for _ in range(500)], url_corpus(200), ["a", "abcdef", "abc", "abd", "ab", "b", "abcdefgh"]]:
+        trie = Trie()
+        radix_trie = RadixTrie()
+        for word in words:
+            trie.insert(word=word)
+            radix_trie.insert(word=word)
+        prefixes = {word[:i] for word in words[:50] for i in range(len(word) + 2)} | {"zz", "abcx"}
+        test += 1
+        errors = []
+        for prefix in sorted(prefixes):
+            expected = trie.find(prefix=prefix)
+            actual = radix_trie.find(prefix=prefix)
+            if (expected is None) != (actual is None) or (expected is not None and (
+                    expected.word_end != actual.word_end or expected.suffixes() != actual.suffixes() or
+                    expected.suffixes(limit=3) != actual.suffixes(limit=3))):
+                errors.append(prefix)
+        if not errors:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Test {test} failed: the radix trie doesn't match the trie for the prefixes {errors[:5]}.")
+            n_errors += 1
+
+    test += 1
+    radix_trie = RadixTrie()
+    radix_trie.insert(word=random_word(10 ** 7))
+    if count_nodes(radix_trie) == 2:
+        print(f"Test {test} passed.")
+    else:
+        print(f"Test {test} failed: a single word should have a single node below the root.")
+        n_errors += 1
+
+    words = url_corpus(10 ** 5)
+    tries = [Trie(), RadixTrie()]
+    for trie in tries:
+        for word in words:
+            trie.insert(word=word)
+    print("\t  URLs and SKUs | nodes | hops per find | find (us)")
+    for trie in tries:
+        hops = 0
+        for word in words[:1000]:
+            node = trie.root
+            i = 0
+            while i < len(word):
+                node = node.children[word[i]]
+                i += len(getattr(node, "label", word[i]))
+                hops += 1
+        find_time = measure(lambda: [trie.find(prefix=word) for word in words[:1000]], repeat=3)["median_ns"] / 1e6
+        print(f"\t{type(trie).__name__:>15} | {count_nodes(trie):>5.0e} | {hops / 1000:>13.1f} | {find_time:>9.2f}")
+
+    return n_errors
+
+
+def dictionary_corpus(n_stems: int) -> list:
+    """Returns the sorted words formed by random stems with common English endings, so many subtrees are equal."""
+    stems = {random_word(random.randint(3, 8)) for _ in range(n_stems)}
+    return sorted(stem + ending for stem in stems for ending in ["", "s", "ed", "ing", "er", "ers"])
+
+
+def test_frozen_trie() -> int:
+    """Test the bulk loader and the frozen trie against the trie, and compare their memory and lookup speed.
 
-    suffix_times = []
-    e_values = [1 + i for i in range(3)]
+    Returns:
+        int: The number of errors
+    """
     test = 0
-    for e in e_values:
+    n_errors = 0
+    for words in [sorted(random_word(random.randint(1, 6)).translate(str.maketrans(ascii_lowercase, "abc" * 8 + "ab"))
+                         for _ in range(500)), dictionary_corpus(200), ["a", "a", "ab", "abc", "b", "ba", "é"]]:
         trie = Trie()
-        trie.insert(word="".join([chr(random.randint(97, 122)) for _ in range(10**e)]))
+        for word in words:
+            trie.insert(word=word)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "words.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("\n".join(words) + "\n\n")
+            with open(path, encoding="utf-8") as file:
+                file_trie = Trie.bulk_load(file)
+        bulk_trie = Trie.bulk_load(words)
+        frozen_trie = bulk_trie.freeze()
 
         test += 1
-        start_time = time()
-        for _ in range(10000):
-            trie.root.suffixes()
-        suffix_times.append((time() - start_time)/10)
-
-    print("")
-    print("\t     | time (ms) |      | Scaled time")
-    print("\tSize |  suffix   |  n   |   suffix")
-    print("\t--------------------------- ---------")
+        if bulk_trie.root.suffixes() == file_trie.root.suffixes() == trie.root.suffixes() == sorted(set(words)) and \
+                count_nodes(bulk_trie) == count_nodes(trie):
+            print(f"Test {test} passed.")
+        else:
+            print(f"Test {test} failed: the bulk loaded tries don't match the trie.")
+            n_errors += 1
+
+        test += 1
+        errors = []
+        for prefix in {word[:i] for word in words for i in range(len(word) + 2)} | {"zz", ""}:
+            expected = trie.find(prefix=prefix)
+            actual = frozen_trie.find(prefix=prefix)
+            if (expected is None) != (actual is None) or (expected is not None and (
+                    expected.word_end != actual.word_end or sorted(expected.suffixes()) != actual.suffixes() or
+                    actual.suffixes(limit=2) != actual.suffixes()[:2])):
+                errors.append(prefix)
+        if not errors and len(frozen_trie) <= count_nodes(trie):
+            print(f"Test {test} passed.")
+        else:
+            print(f"Test {test} failed: the frozen trie doesn't match the trie for the prefixes {errors[:5]}.")
+            n_errors += 1
+
+    class SubclassTrie(Trie):
+        pass
+
+    test += 1
+    subclass_trie = SubclassTrie.bulk_load(["a", "ab", "b"])
+    ranked_trie = RankedTrie.bulk_load(["a", "ab", "ab", "b"])
+    if type(subclass_trie) is SubclassTrie and subclass_trie.root.suffixes() == ["a", "ab", "b"] and \
+            type(ranked_trie) is RankedTrie and ranked_trie.top_k("") == [("ab", 2), ("a", 1), ("b", 1)] and \
+            ranked_trie.top_k("a", k=1) == [("ab", 2)]:
+        print(f"Test {test} passed.")
+    else:
+        print(f"Test {test} failed: the bulk load of a subclass didn't return a matching instance of the subclass.")
+        n_errors += 1
+
+    for words, trie_class in [(words, trie_class) for words in ["abc", None, ["b", "a"], ["a", 3], 5]
+                              for trie_class in (Trie, RankedTrie)]:
+        test += 1
+        try:
+            # noinspection PyTypeChecker
+            trie_class.bulk_load(words)
+        except AttributeError:
+            print(f"Test {test} passed.")
+        else:
+            print(f"Error test {test}: expected an AttributeError exception.")
+            n_errors += 1
+
+    words = dictionary_corpus(2 * 10 ** 4)
+    tracemalloc.start()
+    trie = Trie.bulk_load(words)
+    trie_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    frozen_trie = trie.freeze()
+
+    def insert_all(values: list) -> Trie:
+        inserted_trie = Trie()
+        for value in values:
+            inserted_trie.insert(word=value)
+        return inserted_trie
+
+    build_times = [measure(func, setup=lambda: (words,), warmup=0, repeat=1)["median_ns"] / 1e9
+                   for func in (insert_all, Trie.bulk_load)]
+    queries = random.sample(words, 10 ** 4)
+    print(f"\t{len(words):.1e} words | nodes | memory (MB) | build (s) | find (us)")
+    for name, structure, n_bytes, build_time in [("Trie", trie, trie_bytes, build_times[0]),
+                                                 ("bulk loaded", trie, trie_bytes, build_times[1]),
+                                                 ("FrozenTrie", frozen_trie, frozen_trie.nbytes, None)]:
+        find_time = measure(lambda: [structure.find(prefix=word) for word in queries], repeat=3)["median_ns"] / 1e7
+        build = f"{build_time:>9.3f}" if build_time is not None else f"{'freeze':>9}"
+        print(f"\t{name:>13} | {count_nodes(structure):>5.0e} | {n_bytes / 1e6:>11.2f} | {build} | {find_time:>9.2f}")
+
+    return n_errors
+
+
+def memory_usage() -> dict | None:
+    """Returns the resident, proportional and private memory of this process in bytes, or None if not on Linux.
+
+    The proportional set size (PSS) divides every shared page between the processes sharing it, and the private
+    memory only counts the pages no other process maps.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as file:
+            fields = dict(line.split(":", 1) for line in file if ":" in line and not line[0].isdigit())
+    except OSError:
+        return None
+    kilobytes = {name: int(value.split()[0]) for name, value in fields.items()}
+    return {"rss": kilobytes["Rss"] * 1024, "pss": kilobytes["Pss"] * 1024,
+            "private": (kilobytes["Private_Clean"] + kilobytes["Private_Dirty"]) * 1024}
+
+
+def _trie_worker(mode: str, path: str, queries: list, results):
+    """Loads a trie in a worker process, answers the queries and reports its startup time and memory."""
+    before = memory_usage()
+    start_time = perf_counter_ns()
+    if mode == "mmap":
+        trie = FrozenTrie.load(path)
+    else:
+        with open(path, encoding="utf-8") as file:
+            trie = Trie.bulk_load(file)
+    startup = (perf_counter_ns() - start_time) / 1e9
+    n_found = sum(len(trie.find(prefix=query).suffixes(limit=5)) for query in queries)
+    n_words = sum(1 for _ in trie.root.iter_suffixes())
+    after = memory_usage()
+    private = after["private"] - before["private"] if after is not None else 0
+    results.put((startup, n_found, n_words, private, after["pss"] if after is not None else 0))
+
+
+def benchmark_worker_startup(words: list, n_workers: int = 4):
+    """Measures the startup time and memory of forked workers that bulk load a word file or memory map a saved trie.
+
+    Args:
+        words (list): The sorted words.
+        n_workers (int): The number of worker processes per mode.
+
+    Returns:
+        dict: The results of every worker by mode, each (startup seconds, found suffixes, words, private bytes, PSS),
+            or None for a worker that died, failed or didn't report within `WORKER_TIMEOUT` seconds.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    queries = [word[:3] for word in random.sample(words, 1000)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {"bulk_load": os.path.join(directory, "words.txt"), "mmap": os.path.join(directory, "words.trie")}
+        with open(paths["bulk_load"], "w", encoding="utf-8") as file:
+            file.writelines(word + "\n" for word in words)
+        Trie.bulk_load(words).freeze().save(paths["mmap"])
+        for mode, path in paths.items():
+            queue = context.Queue()
+            workers = [context.Process(target=_trie_worker, args=(mode, path, queries, queue))
+                       for _ in range(n_workers)]
+            for worker in workers:
+                worker.start()
+            worker_results = []
+            for _ in workers:
+                try:
+                    worker_results.append(queue.get(timeout=WORKER_TIMEOUT))
+                except Empty:
+                    break
+            for worker in workers:
+                worker.join(timeout=WORKER_TIMEOUT)
+                if worker.exitcode is None:
+                    worker.terminate()
+                    worker.join()
+            n_failed = max(len(workers) - len(worker_results), sum(worker.exitcode != 0 for worker in workers))
+            results[mode] = worker_results[:len(workers) - n_failed] + [None] * n_failed
+    return results
+
+
+def test_saved_trie() -> int:
+    """Test saving and memory mapping frozen tries, and measure the startup and memory of forked workers.
+
+    Returns:
+        int: The number of errors
+    """
+    test = 0
     n_errors = 0
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        s_suffix = suffix_times[i] / suffix_times[0]
-        print(f"\t10^{e_values[i]} | {suffix_times[i]:>9.3f} | {n:>4} | {s_suffix:>6.1f}")
-        if (s_suffix / n > 3) or (s_suffix / n < 0.5):
-            print(f"Time complexity check for n = {n} failed.")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "words.trie")
+        for words in [["a"], ["a", "ab", "b", "é", "😀"], dictionary_corpus(300)]:
+            frozen_trie = Trie.bulk_load(words).freeze()
+            frozen_trie.save(path)
+            mapped_trie = FrozenTrie.load(path)
+            test += 1
+            prefixes = {word[:i] for word in words for i in range(1, len(word) + 2)} | {"zz"}
+            if mapped_trie.root.suffixes() == sorted(set(words)) and all(
+                    (frozen_trie.find(prefix) is None and mapped_trie.find(prefix) is None) or
+                    frozen_trie.find(prefix).suffixes() == mapped_trie.find(prefix).suffixes() for prefix in prefixes):
+                print(f"Test {test} passed.")
+            else:
+                print(f"Test {test} failed: the memory mapped trie doesn't match the frozen trie.")
+                n_errors += 1
+            mapped_trie.close()
+
+        big_endian = sys.byteorder == "big"
+        for content in [b"", b"not a trie", FROZEN_TRIE_HEADER.pack(FROZEN_TRIE_MAGIC, 0, 4, 5, 5),
+                        FROZEN_TRIE_HEADER.pack(FROZEN_TRIE_MAGIC, not big_endian, 4, 1, 0) + bytes(9),
+                        FROZEN_TRIE_HEADER.pack(FROZEN_TRIE_MAGIC, big_endian, 4, 0, 0) + bytes(4),
+                        FROZEN_TRIE_HEADER.pack(FROZEN_TRIE_MAGIC, big_endian, 4, 1, 0) + array("I", [0, 5]).tobytes() +
+                        b"\x01"]:
+            test += 1
+            with open(path, "wb") as file:
+                file.write(content)
+            try:
+                FrozenTrie.load(path)
+            except AttributeError:
+                print(f"Test {test} passed.")
+            else:
+                print(f"Error test {test}: expected an AttributeError exception.")
+                n_errors += 1
+
+    words = dictionary_corpus(2 * 10 ** 4)
+    results = benchmark_worker_startup(words)
+    print(f"\t{len(words):.1e} words | startup (ms) | private (MB) | PSS (MB), per worker")
+    reference = next((result for result in results["bulk_load"] if result is not None), None)
+    for mode, worker_results in results.items():
+        test += 1
+        n_failed = worker_results.count(None)
+        worker_results = [result for result in worker_results if result is not None]
+        if n_failed:
+            print(f"Test {test} failed: {n_failed} of the {mode} workers died, failed or timed out.")
             n_errors += 1
-    print("You can see the scaled time is rising very close to n.")
-    print("This agrees with a time complexity of O(n).")
+        elif reference is not None and reference[2] == len(set(words)) and \
+                all(result[1:3] == reference[1:3] for result in worker_results):
+            print(f"Test {test} passed.")
+        else:
+            print(f"Test {test} failed: the {mode} workers found different words.")
+            n_errors += 1
+        if worker_results:
+            startup, private, pss = [sum(result[i] for result in worker_results) / len(worker_results)
+                                     for i in (0, 3, 4)]
+            print(f"\t{mode:>13} | {startup * 1e3:>12.2f} | {private / 1e6:>12.2f} | {pss / 1e6:>8.2f}")
+    print("The memory mapped workers start in O(1) and share the file pages instead of each building a trie.")
 
     return n_errors
 
@@ -333,6 +1766,30 @@ def user_tests() -> int:
     print("\nUser test set 5 - suffix O(n) runtime complexity check.")
     n_errors += test_scale_suffixes()
 
+    # Test set 7 - Compact trie
+    print("\nUser test set 7 - Compact array backed trie and its memory per node.")
+    n_errors += test_compact_trie()
+
+    # Test set 8 - Lazy suffixes
+    print("\nUser test set 8 - Lazy, limited and deep suffix enumeration.")
+    n_errors += test_iter_suffixes()
+
+    # Test set 9 - Ranked autocomplete
+    print("\nUser test set 9 - Top k ranked autocomplete from cached completions.")
+    n_errors += test_top_k()
+
+    # Test set 10 - Radix trie
+    print("\nUser test set 10 - Path compressed radix trie.")
+    n_errors += test_radix_trie()
+
+    # Test set 11 - Bulk loaded and frozen tries
+    print("\nUser test set 11 - Bulk loaded trie and frozen DAWG.")
+    n_errors += test_frozen_trie()
+
+    # Test set 12 - Memory mapped tries
+    print("\nUser test set 12 - Saved and memory mapped frozen tries shared by forked workers.")
+    n_errors += test_saved_trie()
+
     return n_errors
 
 
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
-from math import log2
 import random
-from time import time
+
+from benchmark import print_scaling, scaling
 
 
 def get_min_max(array: list) -> tuple:
@@ -37,6 +37,17 @@ def get_min_max(array: list) -> tuple:
     return min_value, max_value
 
 
+def benchmark_cases() -> list:
+    """The scaling benchmark cases of this problem, see `benchmark.scaling`.
+
+    Returns:
+        list: The keyword arguments of every scaling benchmark.
+    """
+    return [dict(name="problem_6.get_min_max", func=get_min_max,
+                 setup=lambda n: ([random.randint(-100, 100) for _ in range(n)],), sizes=[10 ** e for e in range(5, 8)],
+                 expected="O(n)", repeat=3)]
+
+
 def given_tests():
     array = [i for i in range(0, 10)]  # a list containing 0 - 9
     random.shuffle(array)
@@ -80,22 +91,8 @@ def user_tests():
 
     # User Test Case 3 - Scaling test
     print("\nUser test set 3 - O(n) runtime complexity check.")
-    times = []
-    e_values = [5 + i for i in range(3)]
-    test = 0
-    for e in e_values:
-        test += 1
-        array = [random.randint(-100, 100) for _ in range(10 ** e)]
-        start_time = time()
-        get_min_max(array=array)
-        times.append(time() - start_time)
-        print(f"\tTest {test} completed in {times[-1]:.2f} seconds for n = 10^{e}.")
-        del array
-
-    print("\tSize, time (s),    n, log n, actual scaled time ")
-    for i in range(len(e_values)):
-        n = 10 ** (e_values[i] - e_values[0])
-        print(f"\t10^{e_values[i]},    {times[i]:.3f}, {n:>4},  {log2(n):>4.1f}, {times[i]/times[0]:>6.1f}")
+    for case in benchmark_cases():
+        print_scaling(scaling(**case))
     print("You can see the scaled time is rising slightly below n but greater than log n.")
     print("This agrees with a time complexity of O(n).")
 
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+from benchmark import check_complexity, print_scaling, scaling
+
 
 class RouteTrieNode:
     """A RouteTrieNode will be similar to our autocomplete TrieNode... with one additional element, a handler."""
@@ -312,6 +314,44 @@ def test_slashes() -> int:
     return n_errors
 
 
+def deep_router(n_paths: int) -> tuple:
+    """Returns a router with a handler on a path of the given depth and that path."""
+    full_path = "/".join(f"p{i}" for i in range(n_paths))
+    router = Router(root_handler="root handler", error_handler="not found handler")
+    router.add_handler(full_path=full_path, handler="deep handler")
+    return router, full_path
+
+
+def benchmark_cases() -> list:
+    """The scaling benchmark cases of this problem, see `benchmark.scaling`.
+
+    Returns:
+        list: The keyword arguments of every scaling benchmark.
+    """
+    return [dict(name="problem_7.Router.lookup", func=Router.lookup, setup=deep_router,
+                 sizes=[10 ** e for e in range(3, 6)], expected="O(n)", number=10)]
+
+
+def test_scale() -> int:
+    """Test the time complexity of the lookup as a function of the number of paths in the full path.
+
+    The timings are only reported. Wall-clock times depend on the machine load, so times that don't scale like the
+    expected complexity only print a warning instead of counting as an error.
+
+    Returns:
+        int: Always 0, the number of errors
+    """
+    for case in benchmark_cases():
+        result = scaling(**case)
+        print_scaling(result)
+        if result["expected"] is not None and not check_complexity(result):
+            print(f"Warning: the times of {result['name']} don't scale like {result['expected']}, which can happen "
+                  f"when the machine is busy.")
+    print("The lookup splits the path and visits one node per path, so it has a time complexity of O(n).")
+
+    return 0
+
+
 # noinspection PyBroadException
 def user_tests() -> int:
     """Runs the user tests."""
@@ -330,6 +370,10 @@ def user_tests() -> int:
     print("\nUser test set 3 - Leading and training '/' (MORE BONUS POINTS).")
     n_errors += test_slashes()
 
+    # Test the lookup time complexity
+    print("\nUser test set 4 - lookup O(n) runtime complexity check.")
+    n_errors += test_scale()
+
     return n_errors
 
 